@@ -6,7 +6,12 @@ from app.api.schemas import (
     IngestRequest,
     IngestResponse,
 )
-from app.api.routes import router, init_routes
+from app.api.routes import (
+    router,
+    get_graph_builder,
+    get_indexer,
+    get_rag_evaluator,
+)
 
 __all__ = [
     "QueryRequest",
@@ -14,5 +19,7 @@ __all__ = [
     "IngestRequest",
     "IngestResponse",
     "router",
-    "init_routes",
+    "get_graph_builder",
+    "get_indexer",
+    "get_rag_evaluator",
 ]
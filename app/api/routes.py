@@ -1,7 +1,7 @@
 import logging
 import time
 from typing import Optional
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from app.api.schemas import (
     QueryRequest,
     QueryResponse,
@@ -13,30 +13,43 @@ from app.api.schemas import (
 )
 from app.graph.graph_builder import RAGGraphBuilder
 from app.monitoring.rag_evaluators import RAGEvaluator
-from app.llm.groq_wrapper import GroqLLM
+from app.vector.rag_cache import RAGResultCache
+from app.vector.retriever import Retriever
 
 logger = logging.getLogger("rag_llm_system")
 
 router = APIRouter(prefix="/api/v1", tags=["RAG"])
 
-# Global dependencies
-_graph_builder: Optional[RAGGraphBuilder] = None
-_indexer = None
-_rag_evaluator: Optional[RAGEvaluator] = None
 
+# ============================================================================
+# DEPENDENCIES
+# ============================================================================
+# Components are attached to ``app.state`` by the application lifespan and
+# resolved per request, so each worker process owns its own instances.
 
-def init_routes(graph_builder: RAGGraphBuilder, indexer) -> None:
-    """Initialize routes with dependencies."""
-    global _graph_builder, _indexer, _rag_evaluator
-    
-    _graph_builder = graph_builder
-    _indexer = indexer
-    
-    # Initialize evaluator
-    judge_llm = GroqLLM()
-    _rag_evaluator = RAGEvaluator()
-    
-    logger.info("✅ Routes initialized with graph builder, indexer, and evaluator")
+def get_graph_builder(request: Request) -> Optional[RAGGraphBuilder]:
+    """Resolve the compiled RAG graph builder from application state."""
+    return getattr(request.app.state, "graph_builder", None)
+
+
+def get_indexer(request: Request):
+    """Resolve the document indexer from application state."""
+    return getattr(request.app.state, "indexer", None)
+
+
+def get_rag_evaluator(request: Request) -> Optional[RAGEvaluator]:
+    """Resolve the RAG evaluator from application state."""
+    return getattr(request.app.state, "rag_evaluator", None)
+
+
+def get_retriever(request: Request) -> Optional[Retriever]:
+    """Resolve the retriever (and its retrieval cache) from application state."""
+    return getattr(request.app.state, "retriever", None)
+
+
+def get_rag_result_cache(request: Request) -> Optional[RAGResultCache]:
+    """Resolve the full-result cache used by smart routing from application state."""
+    return getattr(request.app.state, "rag_result_cache", None)
 
 
 # ============================================================================
@@ -44,17 +57,20 @@ def init_routes(graph_builder: RAGGraphBuilder, indexer) -> None:
 # ============================================================================
 
 @router.post("/query", response_model=QueryResponse)
-async def query(request: QueryRequest) -> QueryResponse:
+async def query(
+    request: QueryRequest,
+    graph_builder: Optional[RAGGraphBuilder] = Depends(get_graph_builder),
+) -> QueryResponse:
     """
     Process a query through the RAG system.
     
     Returns answer, retrieved docs, judge evaluation, and metadata.
     """
     logger.info(f"Processing query: {request.query[:100]}")
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
     
     try:
-        if not _graph_builder:
+        if not graph_builder:
             raise HTTPException(
                 status_code=500,
                 detail="Graph builder not initialized"
@@ -68,7 +84,7 @@ async def query(request: QueryRequest) -> QueryResponse:
         }
         
         # Execute graph - returns dict
-        result = _graph_builder.invoke(state)
+        result = graph_builder.invoke(state)
         
         # Parse retrieved docs
         retrieved_docs = []
@@ -102,7 +118,7 @@ async def query(request: QueryRequest) -> QueryResponse:
             or "I apologize, but I couldn't find enough information to answer your question."
         )
         
-        processing_time = time.time() - start_time
+        processing_time = (time.perf_counter_ns() - start_ns) / 1e9
         
         response = QueryResponse(
             query=request.query,
@@ -135,7 +151,10 @@ async def query(request: QueryRequest) -> QueryResponse:
 # ============================================================================
 
 @router.get("/evaluation/summary")
-async def get_evaluation_summary(last_n: int = 100):
+async def get_evaluation_summary(
+    last_n: int = 100,
+    rag_evaluator: Optional[RAGEvaluator] = Depends(get_rag_evaluator),
+):
     """
     Get RAG evaluation summary statistics.
     
@@ -153,13 +172,13 @@ async def get_evaluation_summary(last_n: int = 100):
     logger.info(f"Getting evaluation summary for last {last_n} evaluations")
     
     try:
-        if not _rag_evaluator:
+        if not rag_evaluator:
             raise HTTPException(
                 status_code=500,
                 detail="Evaluator not initialized"
             )
         
-        summary = _rag_evaluator.get_evaluation_summary(last_n=last_n)
+        summary = rag_evaluator.get_evaluation_summary(last_n=last_n)
         
         if not summary:
             return {
@@ -185,6 +204,7 @@ async def evaluate_response(
     answer: str,
     retrieved_docs: list,
     ground_truth_answer: Optional[str] = None,
+    rag_evaluator: Optional[RAGEvaluator] = Depends(get_rag_evaluator),
 ):
     """
     Manually evaluate a RAG response.
@@ -209,13 +229,13 @@ async def evaluate_response(
     logger.info(f"Manual evaluation requested for query: {query[:50]}")
     
     try:
-        if not _rag_evaluator:
+        if not rag_evaluator:
             raise HTTPException(
                 status_code=500,
                 detail="Evaluator not initialized"
             )
         
-        evaluation = _rag_evaluator.evaluate_rag_response(
+        evaluation = rag_evaluator.evaluate_rag_response(
             query=query,
             retrieved_docs=retrieved_docs,
             answer=answer,
@@ -243,7 +263,10 @@ async def evaluate_response(
 # ============================================================================
 
 @router.post("/ingest", response_model=IngestResponse)
-async def ingest(request: IngestRequest) -> IngestResponse:
+async def ingest(
+    request: IngestRequest,
+    indexer=Depends(get_indexer),
+) -> IngestResponse:
     """
     Ingest a document into the vector store.
     
@@ -256,13 +279,13 @@ async def ingest(request: IngestRequest) -> IngestResponse:
     logger.info(f"Ingesting document: {request.file_path}")
     
     try:
-        if not _indexer:
+        if not indexer:
             raise HTTPException(
                 status_code=500,
                 detail="Indexer not initialized"
             )
         
-        chunks_indexed = _indexer.ingest_file(request.file_path)
+        chunks_indexed = indexer.ingest_file(request.file_path)
         
         logger.info(f"✅ Document ingested: {chunks_indexed} chunks")
         
@@ -285,7 +308,10 @@ async def ingest(request: IngestRequest) -> IngestResponse:
 # ============================================================================
 
 @router.get("/health", response_model=HealthResponse)
-async def health() -> HealthResponse:
+async def health(
+    graph_builder: Optional[RAGGraphBuilder] = Depends(get_graph_builder),
+    rag_evaluator: Optional[RAGEvaluator] = Depends(get_rag_evaluator),
+) -> HealthResponse:
     """
     Health check endpoint.
     
@@ -298,8 +324,8 @@ async def health() -> HealthResponse:
             "status": "healthy",
             "version": "1.0.0",
             "database": "ok",
-            "graph_builder": "ok" if _graph_builder else "not_initialized",
-            "evaluator": "ok" if _rag_evaluator else "not_initialized",
+            "graph_builder": "ok" if graph_builder else "not_initialized",
+            "evaluator": "ok" if rag_evaluator else "not_initialized",
         }
         
         logger.info("✅ Health check successful")
@@ -315,7 +341,11 @@ async def health() -> HealthResponse:
 
 
 @router.get("/cache/clear")
-async def clear_cache():
+async def clear_cache(
+    graph_builder: Optional[RAGGraphBuilder] = Depends(get_graph_builder),
+    retriever: Optional[Retriever] = Depends(get_retriever),
+    result_cache: Optional[RAGResultCache] = Depends(get_rag_result_cache),
+):
     """
     Clear the cache.
     
@@ -327,13 +357,17 @@ async def clear_cache():
     logger.warning("Cache clear requested")
     
     try:
-        if not _graph_builder:
+        if not graph_builder:
             raise HTTPException(
                 status_code=500,
                 detail="Graph builder not initialized"
             )
         
-        _graph_builder.cache.clear()
+        graph_builder.cache.clear()
+        if retriever:
+            retriever.clear_cache()
+        if result_cache:
+            result_cache.clear()
         logger.info("✅ Cache cleared")
         
         return {"status": "cache cleared successfully"}
@@ -347,7 +381,11 @@ async def clear_cache():
 
 
 @router.get("/cache/stats")
-async def get_cache_stats():
+async def get_cache_stats(
+    graph_builder: Optional[RAGGraphBuilder] = Depends(get_graph_builder),
+    retriever: Optional[Retriever] = Depends(get_retriever),
+    result_cache: Optional[RAGResultCache] = Depends(get_rag_result_cache),
+):
     """
     Get cache statistics.
     
@@ -359,7 +397,7 @@ async def get_cache_stats():
     logger.info("Cache stats requested")
     
     try:
-        if not _graph_builder:
+        if not graph_builder:
             raise HTTPException(
                 status_code=500,
                 detail="Graph builder not initialized"
@@ -367,11 +405,16 @@ async def get_cache_stats():
         
         # Try to get stats from cache
         try:
-            stats = _graph_builder.cache.get_stats()
+            stats = graph_builder.cache.get_stats()
         except AttributeError:
             # Cache doesn't have get_stats method
             stats = {"message": "Cache stats not available"}
         
+        if retriever:
+            stats["retrieval_cache"] = retriever.get_cache_stats()
+        if result_cache:
+            stats["result_cache"] = result_cache.stats()
+        
         logger.info("✅ Cache stats retrieved")
         
         return stats
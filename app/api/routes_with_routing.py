@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
 import logging
@@ -6,22 +6,25 @@ import traceback
 from langsmith import traceable
 
 from app.routing.model_router import CostAwareRouter, RoutingResult
-from app.models.model_config import MultiModelConfig
 from app.vector.retriever import Retriever
+from app.vector.rag_cache import RAGResultCache
 
 logger = logging.getLogger("rag_llm_system")
 
 router = APIRouter(prefix="/api/v1", tags=["RAG with Routing"])
 
-# Global dependencies
-_router: Optional[CostAwareRouter] = None
-_retriever: Optional[Retriever] = None
+def get_smart_router(request: Request) -> Optional[CostAwareRouter]:
+    """Resolve the cost-aware router from application state."""
+    return getattr(request.app.state, "smart_router", None)
 
-def init_routing(model_config: MultiModelConfig, retriever: Retriever):
-    global _router, _retriever
-    _router = CostAwareRouter(model_config)
-    _retriever = retriever
-    logger.info("✅ Multi-model routing initialized (Global)")
+
+def get_retriever(request: Request) -> Optional[Retriever]:
+    """Resolve the retriever from application state."""
+    return getattr(request.app.state, "retriever", None)
+
+def get_rag_result_cache(request: Request) -> Optional[RAGResultCache]:
+    """Resolve the full-result cache from application state."""
+    return getattr(request.app.state, "rag_result_cache", None)
 
 class SmartQueryRequest(BaseModel):
     query: str
@@ -32,10 +35,31 @@ class SmartQueryRequest(BaseModel):
 # REMOVED response_model=SmartQueryResponse temporarily for debugging
 @router.post("/query/smart")
 @traceable(run_type="chain", name="smart_query_endpoint")
-async def smart_query(request: SmartQueryRequest):    
+async def smart_query(
+    request: SmartQueryRequest,
+    smart_router: Optional[CostAwareRouter] = Depends(get_smart_router),
+    retriever: Optional[Retriever] = Depends(get_retriever),
+    result_cache: Optional[RAGResultCache] = Depends(get_rag_result_cache),
+):
     try:
+        if not smart_router or not retriever:
+            raise HTTPException(
+                status_code=500,
+                detail="Smart routing not initialized"
+            )
+
+        # Same or near-duplicate query already answered: skip retrieval and generation
+        store_version = getattr(retriever.vector_store, "version", 0)
+        cache_key = None
+        if result_cache is not None:
+            cache_key = result_cache.config_key(k=4, optimize_for=request.optimize_for)
+            cached = result_cache.lookup(request.query, cache_key, store_version)
+            if cached is not None:
+                logger.info("✅ Smart query served from result cache")
+                return {**cached["response"], "query": request.query, "cache_hit": True}
+
         # Retrieve
-        docs = _retriever.retrieve(request.query, k=4)
+        docs = retriever.retrieve(request.query, k=4)
         
         # CHECK FOR EMPTY CONTEXT
         if not docs:
@@ -55,7 +79,7 @@ async def smart_query(request: SmartQueryRequest):
         context = "\n\n".join([doc.get("content", "")[:500] for doc in docs])
         
         # Route (This will now include Tracing)
-        result: RoutingResult = await _router.route_and_generate(
+        result: RoutingResult = await smart_router.route_and_generate(
             query=request.query,
             context=context,
             optimize_for=request.optimize_for,
@@ -87,6 +111,8 @@ async def smart_query(request: SmartQueryRequest):
         }
         
         print("DEBUG: Response object built successfully")
+        if result_cache is not None:
+            result_cache.store(request.query, cache_key, docs, response_data, store_version)
         return response_data
         
     except Exception as e:
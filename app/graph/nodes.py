@@ -54,7 +54,7 @@ def retrieval_node(state: Dict[str, Any], retriever: Retriever) -> Dict[str, Any
     
     query = state.get("query", "")
     logger.info(f"Retrieving documents for query: {query[:50]}")
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
     
     try:
         # Retrieve top 2 docs (optimized for performance)
@@ -68,7 +68,7 @@ def retrieval_node(state: Dict[str, Any], retriever: Retriever) -> Dict[str, Any
                 "distance": doc.get("distance", 0.0) if isinstance(doc, dict) else 0.0
             })
         
-        retrieval_time = time.time() - start_time
+        retrieval_time = (time.perf_counter_ns() - start_ns) / 1e9
         logger.info(f"Retrieved {len(retrieved_docs)} documents in {retrieval_time:.2f}s")
         
         return {
@@ -95,7 +95,7 @@ def llm_node(state: Dict[str, Any], llm: GroqLLM) -> Dict[str, Any]:
         return {}
     
     logger.info("Generating answer with LLM")
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
     
     try:
         query = state.get("query", "")
@@ -136,7 +136,7 @@ def llm_node(state: Dict[str, Any], llm: GroqLLM) -> Dict[str, Any]:
             max_tokens=1024
         )
         
-        generation_time = time.time() - start_time
+        generation_time = (time.perf_counter_ns() - start_ns) / 1e9
         logger.info(f"Generated answer ({len(answer)} chars) in {generation_time:.2f}s")
         
         return {
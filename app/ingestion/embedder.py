@@ -2,14 +2,21 @@
 Embedding generation utilities using Sentence Transformers.
 """
 
-from typing import List, Optional
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import List, Optional, Tuple
 import logging
+import threading
 # Updated import to use community embeddings
 from langchain_community.embeddings import HuggingFaceEmbeddings
 from app.config import settings
 
 logger = logging.getLogger("rag_llm_system")
 
+QUERY_CACHE_SIZE = 4096
+# Queries longer than this are keyed by digest rather than held verbatim
+QUERY_KEY_MAX_CHARS = 256
+
 
 class EmbeddingGenerator:
     """Generate embeddings for documents and queries."""
@@ -28,6 +35,8 @@ class EmbeddingGenerator:
                 cache_folder="./data/embeddings_cache",
             )
             self.model_name = model_name
+            self._query_cache: "OrderedDict[str, Tuple[float, ...]]" = OrderedDict()
+            self._query_cache_lock = threading.Lock()
             logger.info("Embeddings initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize embeddings: {str(e)}")
@@ -43,12 +52,28 @@ class EmbeddingGenerator:
         Returns:
             Embedding vector
         """
+        key = query
+        if len(query) > QUERY_KEY_MAX_CHARS:
+            key = blake2b(query.encode("utf-8"), digest_size=16).hexdigest()
+        
+        # Repeated queries (common within a chat session) skip the forward pass
+        with self._query_cache_lock:
+            cached = self._query_cache.get(key)
+            if cached is not None:
+                self._query_cache.move_to_end(key)
+                return list(cached)
+        
         try:
             embedding = self.embeddings.embed_query(query)
-            return embedding
         except Exception as e:
             logger.error(f"Error embedding query: {str(e)}")
             raise
+        
+        with self._query_cache_lock:
+            self._query_cache[key] = tuple(embedding)
+            if len(self._query_cache) > QUERY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+        return embedding
 
     def embed_documents(self, documents: List[str]) -> List[List[float]]:
         """
@@ -55,7 +55,7 @@ class DocumentIndexer:
             chunks = self.text_splitter.split_documents(documents)
 
             # Index
-            self.vector_store.add_documents(chunks)
+            self.vector_store.add_documents(chunks, self.embedding_generator)
 
             logger.info(f"Successfully indexed {len(chunks)} chunks from {file_path}")
             return len(chunks)
@@ -83,7 +83,7 @@ class DocumentIndexer:
             chunks = self.text_splitter.split_documents(documents)
 
             # Index
-            self.vector_store.add_documents(chunks)
+            self.vector_store.add_documents(chunks, self.embedding_generator)
 
             logger.info(f"Successfully indexed {len(chunks)} chunks from directory")
             return len(chunks)
@@ -3,7 +3,7 @@
 from app.llm.groq_wrapper import GroqLLM
 from app.llm.prompts import (
     SYSTEM_PROMPT_RAG,
-    SYSTEM_PROMPT_JUDGE,
+    JUDGE_SYSTEM,
     RAG_PROMPT_TEMPLATE,
     JUDGE_PROMPT_TEMPLATE,
     FALLBACK_MESSAGE,
@@ -12,7 +12,7 @@ from app.llm.prompts import (
 __all__ = [
     "GroqLLM",
     "SYSTEM_PROMPT_RAG",
-    "SYSTEM_PROMPT_JUDGE",
+    "JUDGE_SYSTEM",
     "RAG_PROMPT_TEMPLATE",
     "JUDGE_PROMPT_TEMPLATE",
     "FALLBACK_MESSAGE",
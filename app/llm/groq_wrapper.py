@@ -6,7 +6,7 @@ from tenacity import retry, stop_after_attempt, wait_exponential
 from app.config import settings
 from app.llm.prompts import (
     SYSTEM_PROMPT_RAG,
-    SYSTEM_PROMPT_JUDGE,
+    JUDGE_SYSTEM,
     RAG_PROMPT_TEMPLATE,
     JUDGE_PROMPT_TEMPLATE,
 )
@@ -29,6 +29,13 @@ class GroqLLM:
             logger.error(f"Failed to initialize Groq: {str(e)}")
             raise
 
+    def warmup(self) -> None:
+        """Open the HTTPS connection ahead of the first real request."""
+        try:
+            self.client.models.list()
+        except Exception as e:
+            logger.debug("Groq warmup failed: %s", e)
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
@@ -107,7 +114,7 @@ class GroqLLM:
             logger.info("Evaluating answer quality")
             
             messages = [
-                {"role": "system", "content": SYSTEM_PROMPT_JUDGE},
+                {"role": "system", "content": JUDGE_SYSTEM},
                 {"role": "user", "content": prompt}
             ]
             
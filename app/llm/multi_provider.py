@@ -1,6 +1,8 @@
 import asyncio
+import threading
 import time
-from typing import Dict, Any
+from collections.abc import Mapping
+from typing import Callable, Dict, Any, Iterator
 from abc import ABC, abstractmethod
 import logging
 from langsmith import traceable
@@ -64,29 +66,63 @@ class OllamaProvider(BaseLLMProvider):
     def estimate_cost(self, input_tokens: int, output_tokens: int) -> float:
         return 0.0
 
+# provider name -> factory taking a ModelConfig
+_PROVIDER_FACTORIES: Dict[str, Callable[[Any], BaseLLMProvider]] = {
+    "groq": lambda cfg: GroqProvider(cfg.api_key, cfg.model_name, cfg.cost_per_1k_tokens),
+    "ollama": lambda cfg: OllamaProvider(cfg.endpoint, cfg.model_name, cfg.cost_per_1k_tokens),
+    # Add OpenAI here if needed
+}
+
+
+class _LazyProviders(Mapping):
+    """Read-only model name -> provider mapping that builds clients on first use."""
+
+    def __init__(self, models: Mapping):
+        self._models = models
+        self._providers: Dict[str, BaseLLMProvider] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name: str) -> BaseLLMProvider:
+        provider = self._providers.get(name)
+        if provider is not None:
+            return provider
+        if name not in self:
+            raise KeyError(name)
+        with self._lock:
+            provider = self._providers.get(name)
+            if provider is None:
+                cfg = self._models[name]
+                provider = _PROVIDER_FACTORIES[cfg.provider](cfg)
+                self._providers[name] = provider
+                logger.debug(f"Initialized {cfg.provider} provider for {name}")
+        return provider
+
+    def __contains__(self, name: object) -> bool:
+        # Only the named model's config is built, not its client
+        return name in self._models and self._models[name].provider in _PROVIDER_FACTORIES
+
+    def __iter__(self) -> Iterator[str]:
+        return (name for name in self._models if name in self)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
 class MultiProviderLLM:
     def __init__(self, model_config):
         self.model_config = model_config
-        self.providers = {}
-        self._init_providers()
+        # Provider clients are created on the first generate() for each model
+        self.providers = _LazyProviders(self.model_config.models)
     
-    def _init_providers(self):
-        for name, cfg in self.model_config.models.items():
-            if cfg.provider == "groq":
-                self.providers[name] = GroqProvider(cfg.api_key, cfg.model_name, cfg.cost_per_1k_tokens)
-            elif cfg.provider == "ollama":
-                self.providers[name] = OllamaProvider(cfg.endpoint, cfg.model_name, cfg.cost_per_1k_tokens)
-            # Add OpenAI here if needed
-
     @traceable(run_type="llm", name="llm_generation")
     async def generate(self, model_name: str, prompt: str, max_tokens: int = 1024, temperature: float = 0.7) -> Dict[str, Any]:
         if model_name not in self.providers:
             raise ValueError(f"Model {model_name} not initialized")
         
         provider = self.providers[model_name]
-        start = time.time()
+        start_ns = time.perf_counter_ns()
         answer = await provider.generate_async(prompt, max_tokens, temperature)
-        latency = (time.time() - start) * 1000
+        latency = (time.perf_counter_ns() - start_ns) / 1_000_000
         
         input_tokens = len(prompt) // 4
         output_tokens = len(answer) // 4
@@ -12,19 +12,6 @@ Prompt templates for various RAG tasks.
 # - If uncertain, express that uncertainty.
 # """
 
-SYSTEM_PROMPT_JUDGE = """You are an expert evaluator assessing the quality of AI-generated responses.
-
-Evaluate responses on the following criteria:
-1. Correctness: Is the answer factually accurate based on the provided context?
-2. Relevance: Does the answer directly address the question asked?
-3. Completeness: Does the answer cover all important aspects of the question?
-4. Clarity: Is the answer well-written and easy to understand?
-5. Citation Usage: Are sources properly cited when applicable?
-
-Provide scores from 0-10 for each criterion and an overall score.
-Format your response as valid JSON.
-"""
-
 # JUDGE_PROMPT_TEMPLATE = """Evaluate the following response:
 
 # Question: {question}
@@ -66,69 +53,44 @@ Format your response as valid JSON.
 Prompt templates for RAG system - IMPROVED for better quality.
 """
 
-# System prompt - emphasis on using context
-SYSTEM_PROMPT_RAG = """You are a helpful AI assistant with access to a knowledge base. 
-Your task is to answer questions based on the provided context documents.
-
-IMPORTANT RULES:
-1. Always cite specific document numbers when referencing information
-2. Base your answer ONLY on the provided documents
-3. If the information is not in the documents, explicitly state that
-4. Provide detailed, structured answers with multiple perspectives if available
-5. Correct any factual errors and clarify ambiguous points
-6. Use the exact information from the documents, don't speculate
-
-Format your response with:
-- Clear introduction addressing the question
-- Detailed explanation with document references
-- Key takeaways if applicable
-- Any limitations or caveats based on the documents provided"""
-
-# Judge prompt - IMPROVED for better JSON
-JUDGE_PROMPT_TEMPLATE = """Evaluate the following answer based on these criteria.
-
-QUESTION: {question}
-
+# System prompt - grounded and concise (output tokens dominate latency/cost)
+SYSTEM_PROMPT_RAG = """You are a helpful AI assistant with access to a knowledge base.
+Answer questions using ONLY the provided context documents.
+
+RULES:
+1. Answer in at most 5 sentences.
+2. Cite document numbers briefly, e.g. "(Doc 1)".
+3. If the information is not in the documents, say so in one sentence.
+4. Do not speculate beyond the documents.
+5. Prefer plain text; do not use markdown or headings unless asked.
+6. Do not restate the question."""
+
+# Judge system prompt - rubric and output schema live here once so the
+# per-call user message only carries question/context/answer
+JUDGE_SYSTEM = """You are an expert evaluator of answers produced from context documents.
+
+Rate the answer 0-10 on each criterion:
+1. Correctness: factually accurate based on the context
+2. Relevance: directly addresses the question
+3. Completeness: covers all aspects of the question
+4. Clarity: well-written and understandable
+5. Citations: references the source documents
+
+Return ONLY a valid JSON object (no markdown, no extra text):
+{"score": <0-10>, "reasons": "<explanation>", "criteria": {"correctness": <0-10>, "relevance": <0-10>, "completeness": <0-10>, "clarity": <0-10>, "citations": <0-10>}}"""
+
+# Judge user message
+JUDGE_PROMPT_TEMPLATE = """QUESTION: {question}
 CONTEXT: {context}
-
-ANSWER TO EVALUATE: {answer}
-
-Rate the answer on a scale of 0-10 for each criterion:
-1. Correctness: Is the answer factually accurate based on the context?
-2. Relevance: Does it directly address the question?
-3. Completeness: Does it cover all aspects of the question?
-4. Clarity: Is the answer well-written and understandable?
-5. Citations: Does it properly reference the source documents?
-
-IMPORTANT: Return ONLY a valid JSON object (no markdown, no extra text):
-{{
-    "score": <number 0-10>,
-    "reasons": "<explanation of the score>",
-    "criteria": {{
-        "correctness": <number 0-10>,
-        "relevance": <number 0-10>,
-        "completeness": <number 0-10>,
-        "clarity": <number 0-10>,
-        "citations": <number 0-10>
-    }}
-}}
-
-Return ONLY JSON. No additional text."""
+ANSWER: {answer}"""
 
 # RAG prompt template
-RAG_PROMPT_TEMPLATE = """Based on the following context documents, please answer the question:
-
-CONTEXT DOCUMENTS:
+RAG_PROMPT_TEMPLATE = """CONTEXT DOCUMENTS:
 {context}
 
 QUESTION: {question}
 
-Please provide a comprehensive answer that:
-1. Directly addresses the question
-2. References specific documents (e.g., "According to Document 1...")
-3. Provides concrete examples or details from the documents
-4. Clarifies any nuances or differences between concepts
-5. Acknowledges any limitations in the provided context"""
+Answer directly and concisely in plain text, citing documents where used."""
 
 # Fallback message
 FALLBACK_MESSAGE = """I apologize, but I was unable to generate a satisfactory answer to your question.
@@ -18,6 +18,19 @@ try:
 except ImportError:
     LANGSMITH_AVAILABLE = False
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _dumps(data) -> str:
+    """Serialize a log payload, stringifying values JSON can't encode."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, default=str).decode("utf-8")
+    return json.dumps(data, default=str)
+
 
 class JsonFormatter(logging.Formatter):
     """Custom formatter that outputs JSON logs for structured logging."""
@@ -40,7 +53,7 @@ class JsonFormatter(logging.Formatter):
         if hasattr(record, "extra_data"):
             log_data.update(record.extra_data)
 
-        return json.dumps(log_data)
+        return _dumps(log_data)
 
 
 def setup_logging() -> logging.Logger:
@@ -96,18 +109,14 @@ def log_with_context(message: str, level: str = "INFO", **context) -> None:
         level: Log level (INFO, DEBUG, WARNING, ERROR, CRITICAL)
         **context: Additional context data to include
     """
-    log_func = getattr(logger, level.lower(), logger.info)
-    record = logging.LogRecord(
-        name="rag_llm_system",
-        level=getattr(logging, level),
-        pathname="",
-        lineno=0,
-        msg=message,
-        args=(),
-        exc_info=None,
+    # Context is emitted as structured fields by JsonFormatter, which only
+    # serializes records that pass the level check
+    logger.log(
+        getattr(logging, level.upper(), logging.INFO),
+        message,
+        extra={"extra_data": context},
+        stacklevel=2,
     )
-    record.extra_data = context
-    log_func(record)
 
 
 def init_langsmith() -> Optional[LangSmithClient]:
@@ -5,30 +5,33 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
 from app.logger import logger
 from app.router import AppRouter
-from app.api.routes import router as api_router, init_routes
-
-# NEW: Import routing router and init function
-from app.api.routes_with_routing import router as routing_router, init_routing
-
-# Global router
-_app_router: AppRouter = None
+from app.api.routes import router as api_router
+from app.api.routes_with_routing import router as routing_router
+from app.monitoring.rag_evaluators import RAGEvaluator
+from app.vector.rag_cache import RAGResultCache
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan management."""
-    global _app_router
-
     # Startup
     logger.info("RAG + LLM System starting up")
-    _app_router = AppRouter()
-    
-    # Initialize legacy routes
-    init_routes(_app_router.graph_builder, _app_router.indexer)
-    
-    # NEW: Initialize routing endpoints using the AppRouter's components
-    if _app_router.model_config and _app_router.retriever:
-        init_routing(_app_router.model_config, _app_router.retriever)
+    app_router = AppRouter()
+
+    # Components are resolved by the routes through FastAPI dependencies
+    app.state.app_router = app_router
+    app.state.graph_builder = app_router.graph_builder
+    app.state.indexer = app_router.indexer
+    app.state.retriever = app_router.retriever
+    app.state.rag_evaluator = RAGEvaluator()
+    app.state.smart_router = None
+    app.state.rag_result_cache = None
+
+    if app_router.cost_router and app_router.retriever:
+        # Reuse the router built during init rather than a second judge pool
+        app.state.smart_router = app_router.cost_router
+        app.state.rag_result_cache = RAGResultCache(app_router.embedding_generator)
+        logger.info("✅ Multi-model routing initialized")
     
     logger.info("System ready for requests")
 
@@ -36,6 +39,8 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     logger.info("RAG + LLM System shutting down")
+    if app_router.cost_router:
+        app_router.cost_router.close()
 
 
 def create_app() -> FastAPI:
@@ -4,19 +4,77 @@ Stores conversations and important information in a database.
 """
 
 import logging
+import os
 import sqlite3
 import json
-from typing import List, Dict, Any, Optional
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 from pathlib import Path
 from langsmith import traceable
 from app.config import settings
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger("rag_llm_system")
 
+# Rows are streamed from SQLite in batches of this size
+FETCH_BATCH_SIZE = 500
+
+# Max sessions kept in each in-process read cache
+READ_CACHE_SIZE = 256
+
+# Per-database session write versions, shared by every LongTermMemory in the
+# process so a write through one instance invalidates the others' caches
+_SESSION_VERSIONS: Dict[str, Dict[str, int]] = {}
+_VERSIONS_LOCK = threading.Lock()
+
+# Facts are upserted per (session_id, key)
+_FACTS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS {name} (
+        session_id TEXT NOT NULL,
+        key TEXT NOT NULL,
+        value TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        PRIMARY KEY (session_id, key),
+        FOREIGN KEY (session_id) REFERENCES conversations(session_id)
+    ) WITHOUT ROWID
+"""
+
+
+def _copy_messages(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Copies of cached messages (including metadata) that callers may mutate."""
+    return [{**m, "metadata": dict(m["metadata"])} for m in messages]
+
+
+def _dump_meta(meta: Optional[Dict[str, Any]]) -> bytes:
+    """Encode metadata for a BLOB column."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(meta or {})
+    return json.dumps(meta or {}, separators=(",", ":")).encode("utf-8")
+
+
+def _load_meta(raw: Optional[bytes]) -> Dict[str, Any]:
+    """Decode a stored metadata column (BLOB, or TEXT from older databases)."""
+    if not raw:
+        return {}
+    return orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+
 
 class LongTermMemory:
-    """Long-term persistent memory using SQLite."""
+    """
+    Long-term persistent memory using SQLite.
+    
+    Session reads are cached in-process and invalidated by writes made through
+    any LongTermMemory in the same process. The database therefore needs a
+    single writing process; writes from another process are not seen until
+    the cached entry is evicted.
+    """
 
     def __init__(self, db_path: str = settings.long_term_memory_db_path):
         """
@@ -27,8 +85,48 @@ class LongTermMemory:
         """
         self.db_path = db_path
         logger.info(f"Initializing long-term memory at {db_path}")
+
+        # Read caches keyed by session, invalidated by a per-session write
+        # version shared with other instances on the same database file
+        with _VERSIONS_LOCK:
+            self._session_version = _SESSION_VERSIONS.setdefault(
+                os.path.abspath(db_path), {}
+            )
+        self._messages_cache: "OrderedDict[str, Tuple[int, List[Dict[str, Any]]]]" = OrderedDict()
+        self._facts_cache: "OrderedDict[str, Tuple[int, Dict[str, str]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
         self._init_db()
 
+    def _bump_version(self, session_id: str) -> None:
+        """Invalidate cached reads for a session after a write."""
+        with _VERSIONS_LOCK:
+            self._session_version[session_id] = self._session_version.get(session_id, 0) + 1
+
+    def _cache_get(self, cache: OrderedDict, session_id: str) -> Tuple[int, Optional[Any]]:
+        """
+        Look up a cached session read.
+        
+        Returns the session's version (captured before any DB query, so a
+        write racing the query leaves the result stale rather than cached
+        under the new version) and the cached value if it matches.
+        """
+        version = self._session_version.get(session_id, 0)
+        with self._cache_lock:
+            entry = cache.get(session_id)
+            if entry is None or entry[0] != version:
+                return version, None
+            cache.move_to_end(session_id)
+            return version, entry[1]
+
+    def _cache_put(self, cache: OrderedDict, session_id: str, version: int, value: Any) -> None:
+        """Store a value read at the given session version (LRU-bounded)."""
+        with self._cache_lock:
+            cache[session_id] = (version, value)
+            cache.move_to_end(session_id)
+            if len(cache) > READ_CACHE_SIZE:
+                cache.popitem(last=False)
+
     def _init_db(self) -> None:
         """Initialize database schema."""
         try:
@@ -37,48 +135,40 @@ class LongTermMemory:
 
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS conversations (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    id INTEGER PRIMARY KEY,
                     session_id TEXT UNIQUE NOT NULL,
                     created_at TEXT NOT NULL,
                     updated_at TEXT NOT NULL,
-                    metadata TEXT
+                    metadata BLOB
                 )
             """)
 
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS messages (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    id INTEGER PRIMARY KEY,
                     session_id TEXT NOT NULL,
                     role TEXT NOT NULL,
                     content TEXT NOT NULL,
                     timestamp TEXT NOT NULL,
-                    metadata TEXT,
+                    metadata BLOB,
                     FOREIGN KEY (session_id) REFERENCES conversations(session_id)
                 )
             """)
 
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS interactions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    id INTEGER PRIMARY KEY,
                     user_id TEXT NOT NULL,
                     session_id TEXT NOT NULL,
                     query TEXT NOT NULL,
                     answer TEXT NOT NULL,
                     created_at TEXT NOT NULL,
-                    metadata TEXT
+                    metadata BLOB
                 )
             """)
 
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS facts (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    session_id TEXT NOT NULL,
-                    key TEXT NOT NULL,
-                    value TEXT NOT NULL,
-                    created_at TEXT NOT NULL,
-                    FOREIGN KEY (session_id) REFERENCES conversations(session_id)
-                )
-            """)
+            cursor.execute(_FACTS_TABLE_SQL.format(name="facts"))
+            self._migrate_facts(cursor)
 
             conn.commit()
             conn.close()
@@ -87,6 +177,28 @@ class LongTermMemory:
             logger.error(f"Failed to initialize database: {str(e)}")
             raise
 
+    @staticmethod
+    def _migrate_facts(cursor: sqlite3.Cursor) -> None:
+        """
+        Rebuild a facts table created by older versions.
+        
+        Older databases key facts by an AUTOINCREMENT id with no
+        (session_id, key) uniqueness, so INSERT OR REPLACE would append
+        duplicates. Keep the latest value per key and recreate the table.
+        """
+        pk = {row[1] for row in cursor.execute("PRAGMA table_info(facts)") if row[5]}
+        if pk == {"session_id", "key"}:
+            return
+
+        logger.info("Migrating facts table to (session_id, key) primary key")
+        cursor.execute(_FACTS_TABLE_SQL.format(name="facts_new"))
+        cursor.execute("""
+            INSERT OR REPLACE INTO facts_new (session_id, key, value, created_at)
+            SELECT session_id, key, value, created_at FROM facts ORDER BY rowid
+        """)
+        cursor.execute("DROP TABLE facts")
+        cursor.execute("ALTER TABLE facts_new RENAME TO facts")
+
     def create_session(
         self, session_id: str, metadata: Optional[Dict[str, Any]] = None
     ) -> None:
@@ -109,7 +221,7 @@ class LongTermMemory:
                 session_id,
                 datetime.utcnow().isoformat(),
                 datetime.utcnow().isoformat(),
-                json.dumps(metadata or {}),
+                _dump_meta(metadata),
             ))
 
             conn.commit()
@@ -149,7 +261,7 @@ class LongTermMemory:
                 role,
                 content,
                 datetime.utcnow().isoformat(),
-                json.dumps(metadata or {}),
+                _dump_meta(metadata),
             ))
 
             # Update session updated_at
@@ -159,7 +271,8 @@ class LongTermMemory:
 
             conn.commit()
             conn.close()
-            logger.debug(f"Added message to session {session_id}")
+            self._bump_version(session_id)
+            logger.debug("Added message to session %s", session_id)
         except Exception as e:
             logger.error(f"Failed to add message: {str(e)}")
 
@@ -195,12 +308,12 @@ class LongTermMemory:
                 query,
                 answer,
                 datetime.utcnow().isoformat(),
-                json.dumps(metadata or {}),
+                _dump_meta(metadata),
             ))
 
             conn.commit()
             conn.close()
-            logger.debug(f"Stored interaction for user {user_id}")
+            logger.debug("Stored interaction for user %s", user_id)
         except Exception as e:
             logger.error(f"Failed to store interaction: {str(e)}")
 
@@ -214,29 +327,34 @@ class LongTermMemory:
         Returns:
             List of messages
         """
+        version, cached = self._cache_get(self._messages_cache, session_id)
+        if cached is not None:
+            return _copy_messages(cached)
+
         try:
             conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute("""
+            conn.row_factory = sqlite3.Row
+            cursor = conn.execute("""
                 SELECT role, content, timestamp, metadata FROM messages
                 WHERE session_id = ?
                 ORDER BY timestamp ASC
             """, (session_id,))
 
-            rows = cursor.fetchall()
+            messages = []
+            while rows := cursor.fetchmany(FETCH_BATCH_SIZE):
+                messages.extend([
+                    {
+                        "role": r["role"],
+                        "content": r["content"],
+                        "timestamp": r["timestamp"],
+                        "metadata": _load_meta(r["metadata"]),
+                    }
+                    for r in rows
+                ])
             conn.close()
 
-            messages = []
-            for role, content, timestamp, metadata_str in rows:
-                messages.append({
-                    "role": role,
-                    "content": content,
-                    "timestamp": timestamp,
-                    "metadata": json.loads(metadata_str or "{}"),
-                })
-
-            return messages
+            self._cache_put(self._messages_cache, session_id, version, messages)
+            return _copy_messages(messages)
         except Exception as e:
             logger.error(f"Failed to get session messages: {str(e)}")
             return []
@@ -257,13 +375,14 @@ class LongTermMemory:
             cursor = conn.cursor()
 
             cursor.execute("""
-                INSERT INTO facts (session_id, key, value, created_at)
+                INSERT OR REPLACE INTO facts (session_id, key, value, created_at)
                 VALUES (?, ?, ?, ?)
             """, (session_id, key, value, datetime.utcnow().isoformat()))
 
             conn.commit()
             conn.close()
-            logger.debug(f"Stored fact: {key}={value}")
+            self._bump_version(session_id)
+            logger.debug("Stored fact: %s=%s", key, value)
         except Exception as e:
             logger.error(f"Failed to store fact: {str(e)}")
 
@@ -277,19 +396,22 @@ class LongTermMemory:
         Returns:
             Dictionary of facts
         """
+        version, cached = self._cache_get(self._facts_cache, session_id)
+        if cached is not None:
+            return dict(cached)
+
         try:
             conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute("""
+            cursor = conn.execute("""
                 SELECT key, value FROM facts
                 WHERE session_id = ?
             """, (session_id,))
 
-            rows = cursor.fetchall()
+            facts = dict(cursor)
             conn.close()
 
-            return {key: value for key, value in rows}
+            self._cache_put(self._facts_cache, session_id, version, facts)
+            return dict(facts)
         except Exception as e:
             logger.error(f"Failed to get facts: {str(e)}")
             return {}
@@ -307,9 +429,8 @@ class LongTermMemory:
         """
         try:
             conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute("""
+            conn.row_factory = sqlite3.Row
+            cursor = conn.execute("""
                 SELECT user_id, session_id, query, answer, created_at, metadata
                 FROM interactions
                 WHERE user_id = ?
@@ -317,20 +438,19 @@ class LongTermMemory:
                 LIMIT ?
             """, (user_id, limit))
 
-            rows = cursor.fetchall()
+            interactions = [
+                {
+                    "user_id": r["user_id"],
+                    "session_id": r["session_id"],
+                    "query": r["query"],
+                    "answer": r["answer"],
+                    "created_at": r["created_at"],
+                    "metadata": _load_meta(r["metadata"]),
+                }
+                for r in cursor.fetchall()
+            ]
             conn.close()
 
-            interactions = []
-            for user_id, session_id, query, answer, created_at, metadata_str in rows:
-                interactions.append({
-                    "user_id": user_id,
-                    "session_id": session_id,
-                    "query": query,
-                    "answer": answer,
-                    "created_at": created_at,
-                    "metadata": json.loads(metadata_str or "{}"),
-                })
-
             return interactions
         except Exception as e:
             logger.error(f"Failed to get user interactions: {str(e)}")
@@ -49,7 +49,7 @@ class ShortTermMemory:
             "metadata": metadata or {},
         }
         self.messages.append(message)
-        logger.debug(f"Added {role} message to short-term memory")
+        logger.debug("Added %s message to short-term memory", role)
 
     def add_message_for_session(
         self,
@@ -77,7 +77,7 @@ class ShortTermMemory:
             "metadata": metadata or {},
         }
         self.sessions[session_id].append(message)
-        logger.debug(f"Added {role} message to session {session_id}")
+        logger.debug("Added %s message to session %s", role, session_id)
 
     def get_messages(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """
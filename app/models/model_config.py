@@ -1,12 +1,28 @@
 import os
+import re
+import sys
+import copy
+import functools
 import yaml
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Iterator, KeysView, Tuple
+from collections.abc import Mapping
 from dataclasses import dataclass
-from string import Template
 from dotenv import load_dotenv
 
-@dataclass
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# .env only needs to be read once per process
+_DOTENV_LOADED = False
+
+# Matches $$ (an escaped "$"), ${VAR} and $VAR, like string.Template
+_ENV_RE = re.compile(r"\$(?:(\$)|\{([A-Za-z_][A-Za-z0-9_]*)\}|([A-Za-z_][A-Za-z0-9_]*))")
+
+
+@dataclass(slots=True, frozen=True)
 class ModelConfig:
     name: str
     provider: str
@@ -15,53 +31,122 @@ class ModelConfig:
     latency_ms_estimate: int
     context_window: int
     quality_tier: str
-    ideal_for: List[str]
+    ideal_for: Tuple[str, ...]
     max_complexity: float
     endpoint: str = ""
     api_key: str = ""
 
+
+@functools.lru_cache(maxsize=8)
+def _read_config(path: str, mtime: float) -> Tuple[str, Tuple[str, ...]]:
+    """Read a models config once per (path, mtime), noting the env vars it references."""
+    with open(path, "r") as f:
+        config_str = f.read()
+
+    names = []
+    for match in _ENV_RE.finditer(config_str):
+        name = match.group(2) or match.group(3)
+        if name and name not in names:
+            names.append(name)
+    return config_str, tuple(names)
+
+
+@functools.lru_cache(maxsize=8)
+def _parse_yaml(path: str, mtime: float, env: Tuple[Tuple[str, str], ...]) -> Dict[str, Any]:
+    """Substitute and parse a models config; memoized per file version and env values."""
+    config_str, _ = _read_config(path, mtime)
+    values = dict(env)
+
+    # Unset variables are left as-is (safe_substitute semantics) so a
+    # missing OPENAI_API_KEY doesn't crash when that model isn't used
+    def _substitute(match: "re.Match[str]") -> str:
+        if match.group(1):
+            return "$"
+        return values.get(match.group(2) or match.group(3), match.group(0))
+
+    return yaml.load(_ENV_RE.sub(_substitute, config_str), Loader=_YamlLoader) or {}
+
+
+def _load_yaml(path: str, mtime: float) -> Dict[str, Any]:
+    """
+    Parsed models config for the current environment.
+
+    The cache key includes the values of every variable the file references,
+    so changing one re-parses; callers get a private deep copy to mutate.
+    """
+    _, names = _read_config(path, mtime)
+    env = tuple((name, os.environ[name]) for name in names if name in os.environ)
+    return copy.deepcopy(_parse_yaml(path, mtime, env))
+
+
+def _build_model(name: str, cfg: Dict[str, Any]) -> ModelConfig:
+    return ModelConfig(
+        name=name,
+        provider=sys.intern(cfg["provider"]),
+        model_name=cfg["model_name"],
+        cost_per_1k_tokens=cfg["cost_per_1k_tokens"],
+        latency_ms_estimate=cfg["latency_ms_estimate"],
+        context_window=cfg["context_window"],
+        quality_tier=sys.intern(cfg["quality_tier"]),
+        ideal_for=tuple(cfg.get("ideal_for") or ()),
+        max_complexity=cfg.get("max_complexity", 1.0),
+        endpoint=cfg.get("endpoint", ""),
+        api_key=cfg.get("api_key", ""),
+    )
+
+
+class _LazyModels(Mapping):
+    """Read-only name -> ModelConfig mapping that builds entries on first access."""
+
+    def __init__(self, raw_models: Dict[str, Dict[str, Any]]):
+        self._raw_models = raw_models
+        self._models_cache: Dict[str, ModelConfig] = {}
+
+    def __getitem__(self, name: str) -> ModelConfig:
+        model = self._models_cache.get(name)
+        if model is None:
+            model = _build_model(name, self._raw_models[name])
+            self._models_cache[name] = model
+        return model
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._raw_models
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._raw_models)
+
+    def __len__(self) -> int:
+        return len(self._raw_models)
+
+
 class MultiModelConfig:
     def __init__(self, config_path: str = "config/models.yaml"):
-        load_dotenv()
+        global _DOTENV_LOADED
+        if not _DOTENV_LOADED:
+            load_dotenv()
+            _DOTENV_LOADED = True
         config_file = Path(config_path)
         if not config_file.exists():
             # Create default if missing to prevent crash
             Path("config").mkdir(exist_ok=True)
             raise FileNotFoundError(f"Models config not found: {config_path}")
             
-        with open(config_file, "r") as f:
-            config_str = f.read()
-            
-        # Substitute environment variables
-        # Use safe_substitute to avoid crashing if OPENAI_API_KEY is missing but not used
-        config_str = Template(config_str).safe_substitute(os.environ)
-        
-        self.config = yaml.safe_load(config_str)
-        self.models = self._load_models()
+        self.config = _load_yaml(str(config_file.resolve()), config_file.stat().st_mtime)
+        # ModelConfig objects are only built for models that are actually used
+        self.models = _LazyModels(self.config.get("models") or {})
         self.routing = self.config.get("routing", {})
         
-    def _load_models(self) -> Dict[str, ModelConfig]:
-        models = {}
-        for name, cfg in self.config.get("models", {}).items():
-            models[name] = ModelConfig(
-                name=name,
-                provider=cfg["provider"],
-                model_name=cfg["model_name"],
-                cost_per_1k_tokens=cfg["cost_per_1k_tokens"],
-                latency_ms_estimate=cfg["latency_ms_estimate"],
-                context_window=cfg["context_window"],
-                quality_tier=cfg["quality_tier"],
-                ideal_for=cfg.get("ideal_for", []),
-                max_complexity=cfg.get("max_complexity", 1.0),
-                endpoint=cfg.get("endpoint", ""),
-                api_key=cfg.get("api_key", ""),
-            )
-        return models
+    def __contains__(self, name: str) -> bool:
+        return name in self.models
+
+    def keys(self) -> KeysView:
+        return self.models.keys()
 
     def get_model(self, name: str) -> ModelConfig:
-        if name not in self.models:
-            raise ValueError(f"Model not found: {name}")
-        return self.models[name]
+        try:
+            return self.models[name]
+        except KeyError:
+            raise ValueError(f"Model not found: {name}") from None
 
     def get_fallback_chain(self) -> List[str]:
         return self.routing.get("fallback_chain", [])
@@ -0,0 +1,42 @@
+"""
+NDCG kernel, JIT-compiled with Numba when it is installed.
+
+Numba is an optional dependency and is not listed in requirements.txt;
+install it separately (``pip install numba``) to enable the compiled path.
+Without it the decorator is a no-op and the kernel runs as plain Python;
+callers should check NUMBA_AVAILABLE and prefer their NumPy paths.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit (supports bare and called forms)."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True, fastmath=True)
+def ndcg_kernel(rel, k, discounts):
+    """NDCG@k over a float64 relevance vector (IDCG from the full list).
+
+    ``discounts[i]`` must hold 1 / log2(i + 2) for every rank up to k.
+    """
+    n = min(k, rel.size)
+    dcg = 0.0
+    for i in range(n):
+        dcg += rel[i] * discounts[i]
+
+    ideal = np.sort(rel)[::-1]
+    idcg = 0.0
+    for i in range(n):
+        idcg += ideal[i] * discounts[i]
+
+    return dcg / idcg if idcg > 0.0 else 0.0
+
@@ -1,3 +1,5 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
 try:
     from langsmith import Client
     LANGSMITH_AVAILABLE = True
@@ -6,76 +8,91 @@ except ImportError:
     Client = None
 
 
-def retrieval_precision_evaluator(inputs: dict, outputs: dict, reference_outputs: dict = None) -> dict:
-    """
-    Evaluate retrieval precision.
-    
-    Args:
-        inputs: {"query": str, "ground_truth_docs": List[str]}
-        outputs: {"retrieved_docs": List[Dict], ...}
-        reference_outputs: Reference/ground truth
-    
-    Returns:
-        {"key": "retrieval_precision", "score": float, ...}
-    """
-    retrieval_metrics = outputs.get("retrieval", {})
-    precision = retrieval_metrics.get("precision")
-    
-    if precision is None:
-        precision = retrieval_metrics.get("context_relevance", 0.5)
-    
-    return {
-        "key": "retrieval_precision",
-        "score": float(precision),
-        "comment": f"Retrieval precision: {precision:.2f}"
-    }
+# (result key, comment label, metric path, fallback path, default score)
+_EVAL_SPEC: Tuple[Tuple[str, str, Tuple[str, ...], Optional[Tuple[str, ...]], float], ...] = (
+    ("retrieval_precision", "Retrieval precision", ("retrieval", "precision"), ("retrieval", "context_relevance"), 0.5),
+    ("retrieval_recall", "Retrieval recall", ("retrieval", "recall"), ("retrieval", "hit_rate"), 0.5),
+    ("generation_relevance", "Generation relevance", ("generation", "relevance_score"), None, 0.5),
+    ("generation_groundedness", "Generation groundedness", ("generation", "groundedness_score"), None, 0.5),
+    ("overall_rag_score", "Overall RAG score", ("overall_score",), None, 0.5),
+)
 
 
-def retrieval_recall_evaluator(inputs: dict, outputs: dict, reference_outputs: dict = None) -> dict:
-    """Evaluate retrieval recall."""
-    retrieval_metrics = outputs.get("retrieval", {})
-    recall = retrieval_metrics.get("recall")
-    
-    if recall is None:
-        recall = retrieval_metrics.get("hit_rate", 0.5)
-    
-    return {
-        "key": "retrieval_recall",
-        "score": float(recall),
-        "comment": f"Retrieval recall: {recall:.2f}"
-    }
+def _lookup(outputs: dict, path: Tuple[str, ...]) -> Any:
+    """Walk a nested key path, returning None when any level is missing."""
+    node = outputs
+    for key in path[:-1]:
+        node = node.get(key) or {}
+    return node.get(path[-1])
 
 
-def generation_relevance_evaluator(inputs: dict, outputs: dict, reference_outputs: dict = None) -> dict:
-    """Evaluate generation relevance."""
-    generation_metrics = outputs.get("generation", {})
-    relevance = generation_metrics.get("relevance_score", 0.5)
-    
-    return {
-        "key": "generation_relevance",
-        "score": float(relevance),
-        "comment": f"Generation relevance: {relevance:.2f}"
-    }
+def _run(spec: tuple, outputs: dict) -> Dict[str, Any]:
+    """Evaluate one spec entry against an outputs dict."""
+    key, label, path, fallback_path, default = spec
 
+    value = _lookup(outputs, path)
+    if value is None and fallback_path:
+        value = _lookup(outputs, fallback_path)
+    if value is None:
+        value = default
 
-def generation_groundedness_evaluator(inputs: dict, outputs: dict, reference_outputs: dict = None) -> dict:
-    """Evaluate generation groundedness (no hallucinations)."""
-    generation_metrics = outputs.get("generation", {})
-    groundedness = generation_metrics.get("groundedness_score", 0.5)
-    
+    score = float(value)
     return {
-        "key": "generation_groundedness",
-        "score": float(groundedness),
-        "comment": f"Generation groundedness: {groundedness:.2f}"
+        "key": key,
+        "score": score,
+        "comment": f"{label}: {score:.2f}"
     }
 
 
-def overall_rag_evaluator(inputs: dict, outputs: dict, reference_outputs: dict = None) -> dict:
-    """Evaluate overall RAG system performance."""
-    overall_score = outputs.get("overall_score", 0.5)
-    
-    return {
-        "key": "overall_rag_score",
-        "score": float(overall_score),
-        "comment": f"Overall RAG score: {overall_score:.2f}"
-    }
\ No newline at end of file
+def _make_evaluator(name: str, spec: tuple, doc: str) -> Callable[..., dict]:
+    """Build a named LangSmith evaluator function for a spec entry."""
+    def evaluator(inputs: dict, outputs: dict, reference_outputs: dict = None) -> dict:
+        return _run(spec, outputs)
+
+    evaluator.__name__ = evaluator.__qualname__ = name
+    evaluator.__doc__ = doc
+    return evaluator
+
+
+_SPECS = {spec[0]: spec for spec in _EVAL_SPEC}
+
+retrieval_precision_evaluator = _make_evaluator(
+    "retrieval_precision_evaluator",
+    _SPECS["retrieval_precision"],
+    "Evaluate retrieval precision (falls back to context relevance).",
+)
+retrieval_recall_evaluator = _make_evaluator(
+    "retrieval_recall_evaluator",
+    _SPECS["retrieval_recall"],
+    "Evaluate retrieval recall (falls back to hit rate).",
+)
+generation_relevance_evaluator = _make_evaluator(
+    "generation_relevance_evaluator",
+    _SPECS["generation_relevance"],
+    "Evaluate generation relevance.",
+)
+generation_groundedness_evaluator = _make_evaluator(
+    "generation_groundedness_evaluator",
+    _SPECS["generation_groundedness"],
+    "Evaluate generation groundedness (no hallucinations).",
+)
+overall_rag_evaluator = _make_evaluator(
+    "overall_rag_evaluator",
+    _SPECS["overall_rag_score"],
+    "Evaluate overall RAG system performance.",
+)
+
+
+def all_evaluators(inputs: dict, outputs: dict, reference_outputs: dict = None) -> List[dict]:
+    """
+    Run every evaluator in a single pass over the outputs.
+
+    Args:
+        inputs: Example inputs
+        outputs: Evaluation outputs ({"retrieval": ..., "generation": ..., "overall_score": ...})
+        reference_outputs: Reference/ground truth
+
+    Returns:
+        List of {"key", "score", "comment"} results
+    """
+    return [_run(spec, outputs) for spec in _EVAL_SPEC]
@@ -1,5 +1,9 @@
 import logging
-from typing import Dict, List, Any, Optional, Callable
+import mmap
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, List, Any, Optional, Callable, Iterator, Iterable
 from pathlib import Path
 import json
 from datetime import datetime
@@ -13,10 +17,70 @@ except ImportError:
     LangSmithClient = None
     wrappers = None
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 from app.config import settings
 
 logger = logging.getLogger("rag_llm_system")
 
+@lru_cache(maxsize=4)
+def get_langsmith_client(api_key: Optional[str]) -> "LangSmithClient":
+    """Return a process-wide LangSmith client (shares its HTTP session)."""
+    return LangSmithClient(api_key=api_key)
+
+
+# Examples uploaded per create_examples call
+EXAMPLE_BATCH_SIZE = 500
+
+# Concurrent create_examples uploads; parsing continues while they are in flight
+UPLOAD_WORKERS = 4
+
+
+def _batched(iterable: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Yield lists of up to ``size`` items (itertools.batched for Python < 3.12)."""
+    it = iter(iterable)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+def _to_example(eval_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert an evaluation log record to a LangSmith example."""
+    return {
+        "inputs": {
+            "query": eval_data.get("query", ""),
+            "retrieved_docs": eval_data.get("retrieval", {}).get("num_retrieved", 0),
+        },
+        "outputs": {
+            "answer": f"[Evaluation ID: {eval_data.get('timestamp')}]",
+        },
+        "metadata": {
+            "session_id": eval_data.get("session_id", ""),
+            "user_id": eval_data.get("user_id", ""),
+            "overall_score": eval_data.get("overall_score", 0),
+            "retrieval_metrics": eval_data.get("retrieval", {}),
+            "generation_metrics": eval_data.get("generation", {}),
+            "system_metrics": eval_data.get("system", {}),
+        }
+    }
+
+
+def _iter_examples(path: Path) -> Iterator[Dict[str, Any]]:
+    """Stream examples from a memory-mapped evaluation JSONL file, skipping bad lines."""
+    if path.stat().st_size == 0:
+        return
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for line in iter(mm.readline, b""):
+            if line.isspace():
+                continue
+            try:
+                yield _to_example(_json_loads(line))
+            except json.JSONDecodeError:
+                continue
+
 
 class LangSmithRAGIntegration:
     """
@@ -36,7 +100,7 @@ class LangSmithRAGIntegration:
             return
         
         try:
-            self.client = LangSmithClient(api_key=settings.langsmith_api_key)
+            self.client = get_langsmith_client(settings.langsmith_api_key)
             logger.info("✅ LangSmith client initialized")
         except Exception as e:
             logger.error(f"Failed to initialize LangSmith: {str(e)}")
@@ -71,49 +135,35 @@ class LangSmithRAGIntegration:
             )
             logger.info(f"✅ Created dataset: {dataset_name} (ID: {dataset.id})")
             
-            # Read evaluation logs and convert to examples
-            examples = []
             evaluations_path = Path(evaluations_file)
             
             if not evaluations_path.exists():
                 logger.warning(f"Evaluation file not found: {evaluations_file}")
                 return dataset.id
             
-            with open(evaluations_path, "r") as f:
-                for line in f:
-                    try:
-                        eval_data = json.loads(line)
-                        
-                        # Convert evaluation to example format
-                        example = {
-                            "inputs": {
-                                "query": eval_data.get("query", ""),
-                                "retrieved_docs": eval_data.get("retrieval", {}).get("num_retrieved", 0),
-                            },
-                            "outputs": {
-                                "answer": f"[Evaluation ID: {eval_data.get('timestamp')}]",
-                            },
-                            "metadata": {
-                                "session_id": eval_data.get("session_id", ""),
-                                "user_id": eval_data.get("user_id", ""),
-                                "overall_score": eval_data.get("overall_score", 0),
-                                "retrieval_metrics": eval_data.get("retrieval", {}),
-                                "generation_metrics": eval_data.get("generation", {}),
-                                "system_metrics": eval_data.get("system", {}),
-                            }
-                        }
-                        
-                        examples.append(example)
-                    except json.JSONDecodeError:
-                        continue
+            # Stream evaluation logs and upload examples in bounded batches on
+            # background threads; in-flight batches are capped to bound memory
+            total = 0
+            pending = set()
+            with ThreadPoolExecutor(
+                max_workers=UPLOAD_WORKERS, thread_name_prefix="ls-upload"
+            ) as executor:
+                for batch in _batched(_iter_examples(evaluations_path), EXAMPLE_BATCH_SIZE):
+                    if len(pending) >= UPLOAD_WORKERS:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            future.result()
+                    pending.add(executor.submit(
+                        self.client.create_examples,
+                        dataset_id=dataset.id,
+                        examples=batch,
+                    ))
+                    total += len(batch)
+                for future in pending:
+                    future.result()
             
-            # Add examples to dataset
-            if examples:
-                self.client.create_examples(
-                    dataset_id=dataset.id,
-                    examples=examples
-                )
-                logger.info(f"✅ Added {len(examples)} examples to dataset")
+            if total:
+                logger.info(f"✅ Added {total} examples to dataset")
             
             return dataset.id
             
@@ -3,31 +3,196 @@ Structured logging for all RAG operations.
 Captures: latency, judge scores, cache stats, model routing.
 """
 
+import atexit
+import functools
 import logging
 import json
+import os
+import queue
+import threading
 import time
-from typing import Dict, Any
-from datetime import datetime
+from bisect import bisect_right
+from enum import IntEnum
+from typing import Dict, Any, Optional, Union
+from hashlib import blake2b
 from pathlib import Path
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+class CacheStatus(IntEnum):
+    """Cache lookup outcome; truthiness equals "hit"."""
+
+    MISS = 0
+    HIT = 1
+
+
+_STR2CS = {"HIT": CacheStatus.HIT, "MISS": CacheStatus.MISS}
+
+# Latency bucket upper bounds (ms) and their percentile labels
+_BUCKETS = (50, 500, 1500)
+_LABELS = ("p25", "p50", "p75", "p99")
+
+
+def _dumps_line(obj: Dict[str, Any]) -> bytes:
+    """Serialize a metric as one JSONL line."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj) + b"\n"
+    return json.dumps(obj).encode("utf-8") + b"\n"
+
+
+def _ts() -> str:
+    """UTC ISO-8601 timestamp with microseconds, without building a datetime."""
+    t = time.time()
+    return f"{time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(t))}.{int((t % 1) * 1e6):06d}Z"
+
+
+class _MetricsWriter:
+    """Background appender for one metrics JSONL file, shared by its loggers."""
+
+    def __init__(self, path: Path, flush_every: int = 0):
+        self._path = path
+        self.flush_every = flush_every
+        self.refs = 0
+        self._queue: "queue.SimpleQueue[Optional[bytes]]" = queue.SimpleQueue()
+        self._fh = path.open("ab", buffering=1 << 16)
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._drain, name="metrics-writer", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def write(self, line: bytes) -> None:
+        self._queue.put_nowait(line)
+
+    def _drain(self) -> None:
+        """Background loop: write queued metrics in batches."""
+        since_sync = 0
+        while True:
+            line = self._queue.get()
+            stop = line is None
+            batch = [] if stop else [line]
+
+            # Pick up everything else already queued before touching the file
+            while not stop:
+                try:
+                    line = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if line is None:
+                    stop = True
+                else:
+                    batch.append(line)
+
+            try:
+                if batch:
+                    self._fh.write(b"".join(batch))
+                    self._fh.flush()
+                    since_sync += len(batch)
+                    if self.flush_every and since_sync >= self.flush_every:
+                        os.fsync(self._fh.fileno())
+                        since_sync = 0
+            except Exception as e:
+                logging.error(f"Failed to write metric: {str(e)}")
+
+            if stop:
+                return
+
+    def close(self) -> None:
+        """Flush pending metrics and close the file."""
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self.close)
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+        try:
+            self._fh.close()
+        except Exception as e:
+            logging.error(f"Failed to close metrics file: {str(e)}")
+
+
+# One writer thread per metrics file, shared by every logger using it
+_WRITERS: Dict[Path, _MetricsWriter] = {}
+_WRITERS_LOCK = threading.Lock()
+
+
+def _acquire_writer(log_file: Path, flush_every: int) -> _MetricsWriter:
+    key = log_file.resolve()
+    with _WRITERS_LOCK:
+        writer = _WRITERS.get(key)
+        if writer is None or writer.closed:
+            writer = _WRITERS[key] = _MetricsWriter(key, flush_every)
+        elif flush_every and (not writer.flush_every or flush_every < writer.flush_every):
+            # Shared file: honour the strictest fsync interval requested
+            writer.flush_every = flush_every
+        writer.refs += 1
+        return writer
+
+
+def _release_writer(writer: _MetricsWriter) -> None:
+    with _WRITERS_LOCK:
+        writer.refs -= 1
+        if writer.refs > 0:
+            return
+        for key, registered in list(_WRITERS.items()):
+            if registered is writer:
+                del _WRITERS[key]
+    writer.close()
+
 
 class MetricsLogger:
     """Structured metrics logging to JSON."""
 
-    def __init__(self, log_file: str = "./logs/metrics.jsonl"):
+    # Prototype for query_execution events: constant fields are pre-filled and
+    # the key order is fixed, so each event is a shallow C-level copy.
+    _QUERY_TEMPLATE: Dict[str, Any] = {
+        "timestamp": None,
+        "event_type": "query_execution",
+        "query_hash": None,
+        "query_length": 0,
+        "session_id": None,
+        "user_id": None,
+        "cache": None,
+        "performance": None,
+        "quality": None,
+        "model": None,
+        "docs_retrieved": 0,
+        "metrics": None,
+    }
+
+    def __init__(self, log_file: str = "./logs/metrics.jsonl", flush_every: int = 0):
         """
         Initialize metrics logger.
+
+        Metrics are queued and written by a background thread through a
+        persistent buffered file handle, so logging never blocks on file I/O.
+        Loggers on the same file share one writer thread.
         
         Args:
             log_file: JSONL file for metrics
+            flush_every: fsync the file every N records (0 disables fsync)
         """
         self.log_file = Path(log_file)
         self.log_file.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_every = flush_every
+
+        self._writer = _acquire_writer(self.log_file, flush_every)
+        self._closed = False
 
     def log_query_execution(
         self,
         query: str,
-        cache_status: str,  # "HIT", "MISS"
+        cache_status: Union[CacheStatus, str],
         cache_level: str,  # "L1", "L2", "NONE"
         retrieval_time_ms: float,
         generation_time_ms: float,
@@ -43,7 +208,7 @@ class MetricsLogger:
         
         Args:
             query: User query
-            cache_status: HIT/MISS
+            cache_status: CacheStatus (legacy "HIT"/"MISS" strings accepted)
             cache_level: L1/L2/NONE
             retrieval_time_ms: Retrieval latency
             generation_time_ms: Generation latency
@@ -55,35 +220,35 @@ class MetricsLogger:
             judge_details: Judge evaluation details
         """
         total_time_ms = retrieval_time_ms + generation_time_ms
+        if not isinstance(cache_status, CacheStatus):
+            cache_status = _STR2CS.get(cache_status, CacheStatus.MISS)
         
-        metrics = {
-            "timestamp": datetime.utcnow().isoformat(),
-            "event_type": "query_execution",
-            "query_hash": self._hash_query(query),
-            "query_length": len(query),
-            "session_id": session_id,
-            "user_id": user_id,
-            "cache": {
-                "status": cache_status,
-                "level": cache_level,
-                "hit": cache_status == "HIT"
-            },
-            "performance": {
-                "retrieval_ms": retrieval_time_ms,
-                "generation_ms": generation_time_ms,
-                "total_ms": total_time_ms
-            },
-            "quality": {
-                "judge_score": judge_score,
-                "threshold_passed": judge_score >= 0.7,
-                "details": judge_details or {}
-            },
-            "model": model_used,
-            "docs_retrieved": docs_retrieved,
-            "metrics": {
-                "retrieval_latency_percentile": self._estimate_percentile(retrieval_time_ms),
-                "total_latency_percentile": self._estimate_percentile(total_time_ms)
-            }
+        metrics = self._QUERY_TEMPLATE.copy()
+        metrics["timestamp"] = _ts()
+        metrics["query_hash"] = self._hash_query(query)
+        metrics["query_length"] = len(query)
+        metrics["session_id"] = session_id
+        metrics["user_id"] = user_id
+        metrics["cache"] = {
+            "status": cache_status.name,
+            "level": cache_level,
+            "hit": bool(cache_status)
+        }
+        metrics["performance"] = {
+            "retrieval_ms": retrieval_time_ms,
+            "generation_ms": generation_time_ms,
+            "total_ms": total_time_ms
+        }
+        metrics["quality"] = {
+            "judge_score": judge_score,
+            "threshold_passed": judge_score >= 0.7,
+            "details": judge_details or {}
+        }
+        metrics["model"] = model_used
+        metrics["docs_retrieved"] = docs_retrieved
+        metrics["metrics"] = {
+            "retrieval_latency_percentile": self._estimate_percentile(retrieval_time_ms),
+            "total_latency_percentile": self._estimate_percentile(total_time_ms)
         }
         
         self._write_metric(metrics)
@@ -98,7 +263,7 @@ class MetricsLogger:
     ) -> None:
         """Log cache operation."""
         metrics = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": _ts(),
             "event_type": "cache_operation",
             "operation": operation,
             "cache_level": cache_level,
@@ -120,7 +285,7 @@ class MetricsLogger:
     ) -> None:
         """Log model routing decision."""
         metrics = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": _ts(),
             "event_type": "model_routing",
             "query_hash": self._hash_query(query),
             "preferred_model": preferred_model,
@@ -133,27 +298,31 @@ class MetricsLogger:
         self._write_metric(metrics)
 
     def _write_metric(self, metric: Dict[str, Any]) -> None:
-        """Write metric to JSONL file."""
+        """Queue metric for the background writer."""
+        if self._closed or self._writer.closed:
+            logging.warning(
+                f"Metric {metric.get('event_type')} dropped: logger for {self.log_file} is closed"
+            )
+            return
         try:
-            with open(self.log_file, "a") as f:
-                f.write(json.dumps(metric) + "\n")
+            self._writer.write(_dumps_line(metric))
         except Exception as e:
             logging.error(f"Failed to write metric: {str(e)}")
 
+    def close(self) -> None:
+        """Stop logging; the shared file is flushed and closed with its last logger."""
+        if self._closed:
+            return
+        self._closed = True
+        _release_writer(self._writer)
+
     @staticmethod
+    @functools.lru_cache(maxsize=4096)
     def _hash_query(query: str) -> str:
-        """Hash query for anonymized tracking."""
-        import hashlib
-        return hashlib.sha256(query.encode()).hexdigest()[:16]
+        """Hash query for anonymized tracking (non-cryptographic use)."""
+        return blake2b(query.encode("utf-8"), digest_size=8).hexdigest()
 
     @staticmethod
     def _estimate_percentile(latency_ms: float) -> str:
         """Estimate latency percentile."""
-        if latency_ms < 50:
-            return "p25"
-        elif latency_ms < 500:
-            return "p50"
-        elif latency_ms < 1500:
-            return "p75"
-        else:
-            return "p99"
\ No newline at end of file
+        return _LABELS[bisect_right(_BUCKETS, latency_ms)]
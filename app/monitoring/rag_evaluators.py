@@ -1,13 +1,111 @@
+import atexit
+import functools
 import json
+import queue
+import threading
 import time
-from typing import Dict, List, Any, Optional
+from collections import deque
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 from pathlib import Path
 import logging
 import numpy as np
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+    _json_loads = orjson.loads
+except ImportError:
+    ORJSON_AVAILABLE = False
+    _json_loads = json.loads
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+from app.monitoring._metric_kernels import (
+    NUMBA_AVAILABLE,
+    ndcg_kernel,
+)
+
 logger = logging.getLogger("rag_llm_system")
 
+# Largest rank with a precomputed NDCG discount
+MAX_K = 1024
+
+# Recent evaluations kept in memory for summaries
+SUMMARY_WINDOW = 1000
+
+# Evaluations file size at which it is rotated to <stem>.<timestamp>.jsonl
+ROTATE_BYTES = 64 * 1024 * 1024
+
+RETRIEVAL_SUMMARY_KEYS = ("precision", "recall", "mrr", "ndcg", "hit_rate", "context_relevance")
+GENERATION_SUMMARY_KEYS = ("relevance_score", "groundedness_score", "completeness_score", "clarity_score", "citations_score")
+
+
+@functools.lru_cache(maxsize=256)
+def _lower_tuple(strs: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Lowercase a ground-truth set once per distinct set (reused across queries)."""
+    return tuple(s.lower() for s in strs)
+
+
+@functools.lru_cache(maxsize=4096)
+def _lower_text(text: str) -> str:
+    """Lowercase a retrieved chunk; the same chunks recur across queries."""
+    return text.lower()
+
+
+def _match_ground_truth(retrieved: List[str], ground_truth: List[str]) -> List[bool]:
+    """
+    Flag each retrieved text that contains, or is contained in, any ground truth.
+    
+    Uses two Aho-Corasick automata (one per direction) when pyahocorasick is
+    installed, so each string is scanned once instead of once per pair.
+    """
+    if not ground_truth:
+        return [False] * len(retrieved)
+    
+    if not AHOCORASICK_AVAILABLE:
+        matches = []
+        for text in retrieved:
+            for gt in ground_truth:
+                if gt in text or text in gt:
+                    matches.append(True)
+                    break
+            else:
+                matches.append(False)
+        return matches
+    
+    # The empty string is a substring of everything (and can't be a pattern)
+    if any(not gt for gt in ground_truth):
+        return [True] * len(retrieved)
+    matches = [not text for text in retrieved]
+    
+    # Direction 1: some ground truth occurs inside a retrieved text
+    gt_automaton = ahocorasick.Automaton()
+    for idx, gt in enumerate(ground_truth):
+        gt_automaton.add_word(gt, idx)
+    gt_automaton.make_automaton()
+    for i, text in enumerate(retrieved):
+        if not matches[i]:
+            matches[i] = next(gt_automaton.iter(text), None) is not None
+    
+    # Direction 2: a retrieved text occurs inside some ground truth
+    pending = {text for i, text in enumerate(retrieved) if not matches[i]}
+    if pending:
+        doc_automaton = ahocorasick.Automaton()
+        for text in pending:
+            doc_automaton.add_word(text, text)
+        doc_automaton.make_automaton()
+        found = set()
+        for gt in ground_truth:
+            found.update(text for _, text in doc_automaton.iter(gt))
+        matches = [m or text in found for m, text in zip(matches, retrieved)]
+    
+    return matches
+
 
 class RetrievalEvaluator:
     """
@@ -20,9 +118,8 @@ class RetrievalEvaluator:
     - Hit Rate (at least 1 relevant doc retrieved)
     """
     
-    def __init__(self):
-        """Initialize retrieval evaluator."""
-        pass
+    # 1 / log2(rank + 1) for rank = 1..MAX_K, shared by every instance
+    _DISCOUNT_LUT = 1.0 / np.log2(np.arange(2, 2 + MAX_K))
     
     def evaluate_retrieval(
         self,
@@ -64,8 +161,13 @@ class RetrievalEvaluator:
         # ================================================================
         # Metric 1: Context Relevance (from distance)
         # ================================================================
-        distances = [doc.get("distance", 1.0) for doc in retrieved_docs]
-        avg_distance = np.mean(distances)
+        # Single conversion reused by every distance-based metric below
+        distances = np.fromiter(
+            (doc.get("distance", 1.0) for doc in retrieved_docs),
+            dtype=np.float64,
+            count=len(retrieved_docs),
+        )
+        avg_distance = distances.mean()
         context_relevance = float(1.0 - avg_distance)
         
         metrics["avg_distance"] = round(float(avg_distance), 4)
@@ -75,7 +177,9 @@ class RetrievalEvaluator:
         # Metric 2: Hit Rate (at least 1 relevant doc?)
         # ================================================================
         # Use distance as proxy: distance < 0.5 = relevant
-        hit_rate = 1.0 if min(distances) < 0.5 else 0.0
+        relevant = distances < 0.5  # shared with MRR below
+        has_relevant = bool(relevant.any())
+        hit_rate = float(has_relevant)
         metrics["hit_rate"] = float(hit_rate)
         
         # ================================================================
@@ -100,7 +204,7 @@ class RetrievalEvaluator:
             metrics.update({
                 "precision": None,  # Can't compute without ground truth
                 "recall": None,
-                "mrr": self._compute_mrr_from_distance(distances),
+                "mrr": self._compute_mrr_from_distance(distances, relevant, has_relevant),
                 "ndcg": self._compute_ndcg_from_distance(distances),
             })
         
@@ -146,25 +250,16 @@ class RetrievalEvaluator:
         ground_truth_docs: List[str]
     ) -> Dict[str, Any]:
         """Compute metrics by comparing retrieved docs to ground truth."""
-        # Simple string matching
+        # Simple string matching (docs carry no stable id, so cache by content)
         retrieved_content = [
-            doc.get("content", "").lower()
+            _lower_text(doc.get("content", ""))
             for doc in retrieved_docs
         ]
         
-        ground_truth_lower = [
-            doc.lower() for doc in ground_truth_docs
-        ]
+        ground_truth_lower = _lower_tuple(tuple(ground_truth_docs))
         
         # Find matches
-        matches = []
-        for retrieved in retrieved_content:
-            for gt in ground_truth_lower:
-                if gt in retrieved or retrieved in gt:
-                    matches.append(True)
-                    break
-            else:
-                matches.append(False)
+        matches = _match_ground_truth(retrieved_content, ground_truth_lower)
         
         num_relevant = sum(matches)
         
@@ -193,46 +288,79 @@ class RetrievalEvaluator:
             "ndcg": round(float(ndcg), 4),
         }
     
-    def _compute_mrr_from_distance(self, distances: List[float]) -> float:
-        """Compute MRR from distance scores."""
-        for rank, distance in enumerate(distances, 1):
-            if distance < 0.5:  # Relevant
-                return 1.0 / rank
-        return 0.0
+    def _compute_mrr_from_distance(
+        self,
+        distances: np.ndarray,
+        relevant: Optional[np.ndarray] = None,
+        has_relevant: Optional[bool] = None
+    ) -> float:
+        """Compute MRR from distance scores (distance < 0.5 = relevant)."""
+        if relevant is None:
+            relevant = distances < 0.5
+        if has_relevant is None:
+            has_relevant = bool(relevant.any())
+        if not has_relevant:
+            return 0.0
+        return 1.0 / (int(np.argmax(relevant)) + 1)
     
     def _compute_ndcg_from_distance(
         self,
-        distances: List[float],
+        distances: np.ndarray,
         k: int = 10
     ) -> float:
         """Compute NDCG from distance scores."""
         # Convert distance to relevance (0-1)
-        relevances = [max(0, 1.0 - d) for d in distances[:k]]
+        relevances = np.clip(1.0 - distances[:k], 0.0, None)
         
-        return self._compute_ndcg_from_relevance(relevances)
+        return self._compute_ndcg_from_relevance(relevances, k)
+    
+    @classmethod
+    def _discounts_for(cls, n: int) -> np.ndarray:
+        """Discounts for ranks 1..n, from the LUT unless n exceeds MAX_K."""
+        if n <= MAX_K:
+            return cls._DISCOUNT_LUT[:n]
+        return 1.0 / np.log2(np.arange(2, 2 + n))
+    
+    @staticmethod
+    def _gains(relevances: List[float], gain: str) -> np.ndarray:
+        """Relevance -> gain: "linear" (rel) or "exponential" (2^rel - 1)."""
+        rel = np.asarray(relevances, dtype=np.float64)
+        if gain == "exponential":
+            return np.exp2(rel) - 1.0
+        if gain != "linear":
+            raise ValueError(f"Unknown NDCG gain: {gain}")
+        return rel
     
     def _compute_ndcg_from_relevance(
         self,
         relevances: List[float],
-        k: int = 10
+        k: int = 10,
+        gain: str = "linear"
     ) -> float:
         """
         Compute NDCG@k.
         
         NDCG = DCG / IDCG
-        DCG = sum(relevance_i / log2(rank_i + 1))
+        DCG = sum(gain(relevance_i) / log2(rank_i + 1))
         IDCG = ideal DCG (if all docs ranked perfectly)
+        
+        Linear gain suits the 0-1 relevance scores used here; the
+        exponential (2^rel - 1) form matches TREC-style graded labels.
+        Both are identical for binary relevance.
         """
+        rel_all = self._gains(relevances, gain)
+        rel = rel_all[:k]
+        discounts = self._discounts_for(rel.size)
+        
+        if NUMBA_AVAILABLE:
+            return float(ndcg_kernel(rel_all, k, discounts))
+        
         # Actual DCG
-        dcg = 0.0
-        for rank, rel in enumerate(relevances[:k], 1):
-            dcg += rel / np.log2(rank + 1)
+        dcg = float(rel @ discounts)
         
         # Ideal DCG (perfect ranking)
-        ideal_relevances = sorted(relevances, reverse=True)[:k]
-        idcg = 0.0
-        for rank, rel in enumerate(ideal_relevances, 1):
-            idcg += rel / np.log2(rank + 1)
+        ideal = np.sort(rel_all)[::-1][:k]
+        idcg = float(ideal @ discounts)
         
         # NDCG
         ndcg = dcg / idcg if idcg > 0 else 0.0
@@ -272,6 +400,238 @@ class GenerationEvaluator:
         return metrics
 
 
+def _dumps_line(obj: Dict[str, Any]) -> bytes:
+    """Serialize an evaluation as one JSONL line."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(obj).encode("utf-8") + b"\n"
+
+
+# Column layout of a summary row
+SUMMARY_FIELDS = (
+    "overall_score",
+    "latency_ms",
+    "cost_usd",
+    *(f"retrieval.{key}" for key in RETRIEVAL_SUMMARY_KEYS),
+    *(f"generation.{key}" for key in GENERATION_SUMMARY_KEYS),
+)
+_RETRIEVAL_COLS = range(3, 3 + len(RETRIEVAL_SUMMARY_KEYS))
+_GENERATION_COLS = range(3 + len(RETRIEVAL_SUMMARY_KEYS), len(SUMMARY_FIELDS))
+
+
+def _summary_values(evaluation: Dict[str, Any]) -> np.ndarray:
+    """Flatten the metrics used by summaries into a row (NaN = missing)."""
+    retrieval = evaluation.get("retrieval") or {}
+    generation = evaluation.get("generation") or {}
+    system = evaluation.get("system") or {}
+    
+    values = [
+        evaluation.get("overall_score", 0.5),
+        system.get("latency_ms", 0),
+        system.get("cost_usd", 0),
+    ]
+    values.extend(retrieval.get(key) for key in RETRIEVAL_SUMMARY_KEYS)
+    values.extend(generation.get(key) for key in GENERATION_SUMMARY_KEYS)
+    return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+
+class _EvaluationWindow:
+    """
+    Ring buffer of recent summary rows with running per-column sums.
+    
+    The window is per process: it is seeded once from the persisted log and
+    then only sees this process's evaluations. With several workers sharing
+    a log file, each reports its own recent history; the JSONL file is the
+    complete record.
+    """
+    
+    def __init__(self, maxlen: int = SUMMARY_WINDOW):
+        self.maxlen = maxlen
+        self.rows = np.full((maxlen, len(SUMMARY_FIELDS)), np.nan)
+        self.size = 0
+        self.head = 0  # next slot to write
+        self.sums = np.zeros(len(SUMMARY_FIELDS))
+        self.counts = np.zeros(len(SUMMARY_FIELDS), dtype=np.int64)
+        self.lock = threading.Lock()
+    
+    def add(self, row: np.ndarray) -> None:
+        with self.lock:
+            self._add_locked(row)
+    
+    def seed(self, rows: List[np.ndarray]) -> None:
+        """Add rows recovered from the log file, before any live evaluation."""
+        with self.lock:
+            for row in rows:
+                self._add_locked(row)
+    
+    def _add_locked(self, row: np.ndarray) -> None:
+        if self.size == self.maxlen:
+            old = self.rows[self.head]
+            present = ~np.isnan(old)
+            self.sums[present] -= old[present]
+            self.counts -= present
+        else:
+            self.size += 1
+        self.rows[self.head] = row
+        present = ~np.isnan(row)
+        self.sums[present] += row[present]
+        self.counts += present
+        self.head = (self.head + 1) % self.maxlen
+    
+    def totals(self, last_n: int) -> tuple:
+        """(count, per-column sums, per-column counts) over the last_n rows."""
+        with self.lock:
+            if last_n >= self.size:
+                return self.size, self.sums.copy(), self.counts.copy()
+            if last_n <= 0:
+                return 0, None, None
+            block = self.rows[(self.head - last_n + np.arange(last_n)) % self.maxlen]
+        present = ~np.isnan(block)
+        return last_n, np.nansum(block, axis=0), present.sum(axis=0)
+
+
+class _EvaluationWriter:
+    """Background appender for the evaluations JSONL file."""
+    
+    def __init__(self, path: Path, rotate_bytes: int = ROTATE_BYTES):
+        self._path = path
+        self._rotate_bytes = rotate_bytes
+        self._queue: "queue.SimpleQueue[Optional[bytes]]" = queue.SimpleQueue()
+        self._fh = path.open("ab", buffering=1 << 16)
+        self._size = self._fh.tell()
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._drain, name="rag-eval-writer", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+    
+    def write(self, line: bytes) -> None:
+        self._queue.put_nowait(line)
+    
+    def _drain(self) -> None:
+        """Write queued lines in batches until the close sentinel arrives."""
+        while True:
+            line = self._queue.get()
+            stop = line is None
+            batch = [] if stop else [line]
+            
+            while not stop:
+                try:
+                    line = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if line is None:
+                    stop = True
+                else:
+                    batch.append(line)
+            
+            try:
+                if batch:
+                    data = b"".join(batch)
+                    self._fh.write(data)
+                    self._fh.flush()
+                    self._size += len(data)
+                    if self._rotate_bytes and self._size >= self._rotate_bytes:
+                        self._rotate()
+            except Exception as e:
+                logger.error(f"❌ Failed to write evaluation: {str(e)}")
+            
+            if stop:
+                return
+    
+    def _rotate(self) -> None:
+        """Move the full file aside and continue in a fresh one."""
+        self._fh.close()
+        stamp = time.strftime("%Y%m%dT%H%M%S")
+        rotated = self._path.with_name(f"{self._path.stem}.{stamp}{self._path.suffix}")
+        seq = 1
+        while rotated.exists():
+            rotated = self._path.with_name(f"{self._path.stem}.{stamp}-{seq}{self._path.suffix}")
+            seq += 1
+        self._path.rename(rotated)
+        self._fh = self._path.open("ab", buffering=1 << 16)
+        self._size = 0
+        logger.info(f"🔄 Rotated evaluations log to {rotated}")
+    
+    def close(self) -> None:
+        """Flush pending evaluations and close the file."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+        try:
+            self._fh.close()
+        except Exception as e:
+            logger.error(f"❌ Failed to close evaluations file: {str(e)}")
+
+
+# One window and one writer per log file, shared by every evaluator using it
+_WINDOWS: Dict[Path, _EvaluationWindow] = {}
+_WRITERS: Dict[Path, _EvaluationWriter] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def _log_segments(metrics_file: Path) -> List[Path]:
+    """The log file followed by its rotated segments, newest first."""
+    rotated = metrics_file.parent.glob(f"{metrics_file.stem}.*{metrics_file.suffix}")
+    segments = sorted(rotated, key=lambda p: p.stat().st_mtime_ns, reverse=True)
+    if metrics_file.exists():
+        segments.insert(0, metrics_file)
+    return segments
+
+
+def _read_tail_rows(metrics_file: Path, maxlen: int) -> List[np.ndarray]:
+    """
+    Summary rows for the last maxlen evaluations persisted for a log file.
+    
+    Reads back through rotated segments when the live file holds fewer
+    than maxlen evaluations (e.g. just after a rotation).
+    """
+    raw_tail: deque = deque()
+    for segment in _log_segments(metrics_file):
+        # Keep raw lines and decode only the ones that fit in the window
+        with open(segment, "rb") as f:
+            lines = deque((line for line in f if line.strip()), maxlen=maxlen - len(raw_tail))
+        raw_tail.extendleft(reversed(lines))
+        if len(raw_tail) >= maxlen:
+            break
+    
+    rows = []
+    for line in raw_tail:
+        try:
+            rows.append(_summary_values(_json_loads(line)))
+        except (ValueError, AttributeError):
+            continue
+    return rows
+
+
+def _get_window(metrics_file: Path) -> _EvaluationWindow:
+    """
+    Shared window for a log file, seeded from its tail on first use.
+    
+    Seeding happens under the registry lock before the window is published,
+    so persisted history always precedes evaluations logged by this process.
+    """
+    key = metrics_file.resolve()
+    with _REGISTRY_LOCK:
+        window = _WINDOWS.get(key)
+        if window is None:
+            window = _EvaluationWindow()
+            window.seed(_read_tail_rows(key, window.maxlen))
+            _WINDOWS[key] = window
+        return window
+
+
+def _get_writer(metrics_file: Path) -> _EvaluationWriter:
+    key = metrics_file.resolve()
+    with _REGISTRY_LOCK:
+        if key not in _WRITERS:
+            _WRITERS[key] = _EvaluationWriter(key)
+        return _WRITERS[key]
+
+
 class RAGEvaluator:
     """
     COMPLETE RAG evaluation system.
@@ -288,6 +648,8 @@ class RAGEvaluator:
         self.generation_eval = GenerationEvaluator()
         self.metrics_file = Path(metrics_file)
         self.metrics_file.parent.mkdir(parents=True, exist_ok=True)
+        self._window = _get_window(self.metrics_file)
+        self._writer = _get_writer(self.metrics_file)
         logger.info(f"Complete RAG evaluator initialized: {self.metrics_file}")
     
     def evaluate_rag_response(
@@ -368,9 +730,9 @@ class RAGEvaluator:
         generation_score = evaluation["generation"].get("avg_generation_score", 0.5)
         evaluation["overall_score"] = (retrieval_score * 0.3) + (generation_score * 0.7)
         
-        # Log to file
-        with open(self.metrics_file, "a") as f:
-            f.write(json.dumps(evaluation) + "\n")
+        # Log to file (queued for the background writer)
+        self._writer.write(_dumps_line(evaluation))
+        self._window.add(_summary_values(evaluation))
         
         logger.info(
             f"✅ Evaluation logged: "
@@ -382,49 +744,44 @@ class RAGEvaluator:
         return evaluation
     
     def get_evaluation_summary(self, last_n: int = 100) -> Dict[str, Any]:
-        """Get summary statistics."""
-        if not self.metrics_file.exists():
-            return {}
+        """
+        Get summary statistics over the most recent evaluations.
         
-        evaluations = []
-        with open(self.metrics_file, "r") as f:
-            for line in f:
-                try:
-                    evaluations.append(json.loads(line))
-                except:
-                    pass
+        Served from the in-memory window (running sums when the whole window
+        is requested), which is seeded from the log file when first created.
+        The window is per process, so with several workers each summarizes
+        the persisted history plus its own evaluations since startup.
         
-        if not evaluations:
+        Args:
+            last_n: Number of recent evaluations to summarize (capped at SUMMARY_WINDOW)
+            
+        Returns:
+            Summary dict, or {} if there are no evaluations
+        """
+        total, sums, counts = self._window.totals(last_n)
+        if not total:
             return {}
         
-        recent = evaluations[-last_n:]
-        
-        # Extract metrics that have values
-        retrieval_metrics = {}
-        generation_metrics = {}
-        
-        for ret_key in ["precision", "recall", "mrr", "ndcg", "hit_rate", "context_relevance"]:
-            values = [
-                e.get("retrieval", {}).get(ret_key)
-                for e in recent
-                if e.get("retrieval", {}).get(ret_key) is not None
-            ]
-            if values:
-                retrieval_metrics[ret_key] = round(np.mean(values), 4)
-        
-        for gen_key in ["relevance_score", "groundedness_score", "completeness_score", "clarity_score", "citations_score"]:
-            values = [
-                e.get("generation", {}).get(gen_key)
-                for e in recent
-            ]
-            if values:
-                generation_metrics[gen_key] = round(np.mean(values), 4)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = sums / counts
+        
+        retrieval_metrics = {
+            RETRIEVAL_SUMMARY_KEYS[i]: round(float(means[col]), 4)
+            for i, col in enumerate(_RETRIEVAL_COLS)
+            if counts[col]
+        }
+        generation_metrics = {
+            GENERATION_SUMMARY_KEYS[i]: round(float(means[col]), 4)
+            for i, col in enumerate(_GENERATION_COLS)
+            if counts[col]
+        }
         
         return {
-            "total_evaluations": len(recent),
-            "avg_overall_score": round(np.mean([e.get("overall_score", 0.5) for e in recent]), 4),
+            "total_evaluations": total,
+            "avg_overall_score": round(float(means[0]), 4),
             "retrieval_metrics": retrieval_metrics,
             "generation_metrics": generation_metrics,
-            "avg_latency_ms": round(np.mean([e.get("system", {}).get("latency_ms", 0) for e in recent]), 2),
-            "total_cost_usd": round(sum([e.get("system", {}).get("cost_usd", 0) for e in recent]), 6),
-        }
\ No newline at end of file
+            "avg_latency_ms": round(float(means[1]), 2),
+            "total_cost_usd": round(float(sums[2]), 6),
+        }
+
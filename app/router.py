@@ -1,4 +1,7 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
 from app.vector.store import VectorStore
 from app.vector.retriever import Retriever
 from app.ingestion.embedder import EmbeddingGenerator
@@ -26,11 +29,23 @@ class AppRouter:
         """Initialize all application components."""
         logger.info("Initializing application components")
 
-        # Initialize embeddings
-        self.embedding_generator = EmbeddingGenerator()
-
-        # Initialize vector store
-        self.vector_store = VectorStore()
+        # Independent components are built concurrently: most of their cost is
+        # I/O (model weights, Chroma, Groq client, Redis, SQLite), so startup
+        # takes roughly the slowest one instead of the sum.
+        with ThreadPoolExecutor(max_workers=6, thread_name_prefix="app-init") as pool:
+            fut_embedder = pool.submit(EmbeddingGenerator)
+            fut_store = pool.submit(VectorStore)
+            fut_llm = pool.submit(GroqLLM)
+            fut_routing = pool.submit(self._init_routing)
+            fut_cache = pool.submit(self._init_cache)
+            fut_memory = pool.submit(lambda: (ShortTermMemory(), LongTermMemory()))
+
+            self.embedding_generator = fut_embedder.result()
+            self.vector_store = fut_store.result()
+            self.llm = fut_llm.result()
+            self.model_config, self.cost_router = fut_routing.result()
+            self.cache = fut_cache.result()
+            self.short_term_memory, self.long_term_memory = fut_memory.result()
 
         # Initialize retriever
         self.retriever = Retriever(
@@ -48,29 +63,6 @@ class AppRouter:
             text_splitter=self.text_splitter,
         )
 
-        # Initialize LLM
-        self.llm = GroqLLM()
-
-        # NEW: Initialize Model Configuration & Router
-        try:
-            self.model_config = MultiModelConfig("config/models.yaml")
-            self.cost_router = CostAwareRouter(self.model_config)
-            logger.info("✅ Multi-model routing initialized in AppRouter")
-        except Exception as e:
-            logger.warning(f"⚠️ Failed to initialize Routing: {e}. Smart query will likely fail.")
-            self.model_config = None
-            self.cost_router = None
-
-        # Initialize cache
-        if settings.cache_type == "redis":
-            self.cache = RedisCache()
-        else:
-            self.cache = FilesystemCache()
-
-        # Initialize memory
-        self.short_term_memory = ShortTermMemory()
-        self.long_term_memory = LongTermMemory()
-
         # Initialize graph
         self.graph_builder = RAGGraphBuilder(
             retriever=self.retriever,
@@ -81,4 +73,23 @@ class AppRouter:
         )
         self.graph_builder.build()
 
-        logger.info("All components initialized successfully")
\ No newline at end of file
+        logger.info("All components initialized successfully")
+
+    @staticmethod
+    def _init_routing() -> Tuple[Optional[MultiModelConfig], Optional[CostAwareRouter]]:
+        """Initialize model configuration and router (None, None on failure)."""
+        try:
+            model_config = MultiModelConfig("config/models.yaml")
+            cost_router = CostAwareRouter(model_config)
+            logger.info("✅ Multi-model routing initialized in AppRouter")
+            return model_config, cost_router
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to initialize Routing: {e}. Smart query will likely fail.")
+            return None, None
+
+    @staticmethod
+    def _init_cache():
+        """Initialize the configured cache backend."""
+        if settings.cache_type == "redis":
+            return RedisCache()
+        return FilesystemCache()
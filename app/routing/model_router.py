@@ -1,6 +1,8 @@
 import asyncio
+import functools
 import time
-from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 import logging
 from langsmith import traceable
@@ -12,6 +14,36 @@ from app.llm.groq_wrapper import GroqLLM
 
 logger = logging.getLogger("rag_llm_system")
 
+# Blocking judge calls run on their own pool, not the loop's default executor
+JUDGE_POOL_WORKERS = 8
+
+REFUSAL_PHRASE = "I cannot find this information in Adarsh's portfolio documents"
+
+# STRICT SYSTEM PROMPT
+PORTFOLIO_SYSTEM_PROMPT = """You are a specialized assistant for Adarsh Kesharwani's portfolio.
+STRICT RULES:
+1. Use ONLY the provided Context below to answer the question.
+2. If the answer is NOT in the Context, you MUST say: "I cannot find this information in Adarsh's portfolio documents."
+3. Do NOT use outside knowledge. Do NOT answer general questions (like "what is the capital of France").
+4. Keep the answer professional and relevant to the provided documents.
+"""
+MAX_CONTEXT_CHARS = 3000
+
+# Answers failing these cheap checks skip the judge and go straight to fallback.
+# The length floor only rejects empty answers; terse ones ("Python.") are valid.
+MIN_ANSWER_CHARS = 1
+_ERROR_PREFIXES = ("Error:", "error:", "ERROR:", "Traceback (most recent call last)")
+_ERROR_MARKERS = ("<html", "<!DOCTYPE", "Internal Server Error")
+
+
+def _is_unusable_answer(answer: str) -> bool:
+    """Cheap pre-judge check for empty, error or HTML-page answers."""
+    text = answer.strip()
+    if len(text) < MIN_ANSWER_CHARS or text.startswith(_ERROR_PREFIXES):
+        return True
+    head = text[:512]
+    return any(marker in head for marker in _ERROR_MARKERS)
+
 @dataclass
 class RoutingResult:
     answer: str
@@ -35,6 +67,15 @@ class CostAwareRouter:
         self.routing_config = model_config.routing
         self.min_quality_score = self.routing_config.get("min_quality_score", 0.75)
         self.fallback_chain = model_config.get_fallback_chain()
+        self._judge_pool = ThreadPoolExecutor(
+            max_workers=JUDGE_POOL_WORKERS, thread_name_prefix="judge"
+        )
+        self._judge_warmup: Optional[asyncio.Future] = None
+        self._chain_cache: Dict[Tuple[str, str], Tuple[str, ...]] = {}
+
+    def close(self) -> None:
+        """Shut down the judge thread pool (call on application shutdown)."""
+        self._judge_pool.shutdown(wait=False, cancel_futures=True)
 
     @traceable(run_type="chain", name="smart_router_orchestrator")
     async def route_and_generate(
@@ -45,24 +86,23 @@ class CostAwareRouter:
         user_id: str = "",
     ) -> RoutingResult:
         """Classify query → Select model → Generate → Judge → Fallback."""
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
+        self._warm_judge()
         
         classification = self.classifier.classify(query)
         model_to_try = self._select_initial_model(classification, optimize_for)
         attempt_chain = self._build_attempt_chain(model_to_try, optimize_for)
+        prompt = self._build_prompt(query, context)
 
-        REFUSAL_PHRASE = "I cannot find this information in Adarsh's portfolio documents"
         for attempt_idx, model_name in enumerate(attempt_chain, 1):
             try:
                 # Generate answer
-                result = await self._generate_with_model(
-                    model_name, query, context
-                )
+                result = await self._generate_with_model(model_name, prompt)
                 answer_text = result["answer"]
                 # --- NEW: Check for Valid Refusal ---
                 if REFUSAL_PHRASE in answer_text:
                     logger.info(f"Model {model_name} correctly refused to answer due to missing context.")
-                    total_latency = (time.time() - start_time) * 1000
+                    total_latency = (time.perf_counter_ns() - start_ns) / 1_000_000
                     
                     return RoutingResult(
                         answer=answer_text,
@@ -79,13 +119,17 @@ class CostAwareRouter:
                         }
                     )
                 
+                if _is_unusable_answer(answer_text):
+                    logger.warning(f"Model {model_name} returned an unusable answer, trying fallback")
+                    continue
+                
                 # Judge quality
                 judge_score = await self._judge_quality(
                     query, result["answer"], context
                 )
 
                 if judge_score >= self.min_quality_score:
-                    total_latency = (time.time() - start_time) * 1000
+                    total_latency = (time.perf_counter_ns() - start_ns) / 1_000_000
                     return RoutingResult(
                         answer=result["answer"],
                         model_used=model_name,
@@ -111,6 +155,13 @@ class CostAwareRouter:
 
         raise Exception(f"All models failed or scored below {self.min_quality_score}")
 
+    def _warm_judge(self) -> None:
+        """Connect the judge client in the background while the first answer generates."""
+        if self._judge_warmup is None:
+            self._judge_warmup = asyncio.get_running_loop().run_in_executor(
+                self._judge_pool, self.judge_llm.warmup
+            )
+
     @traceable(run_type="tool", name="model_selection")
     def _select_initial_model(self, classification: QueryClassification, optimize_for: str) -> str:
         if optimize_for == "cost": return "phi3_mini"
@@ -118,44 +169,54 @@ class CostAwareRouter:
         elif optimize_for == "quality": return "gpt4o_mini"
         return classification.preferred_model
 
-    def _build_attempt_chain(self, initial_model: str, optimize_for: str) -> List[str]:
-        if optimize_for == "quality": return [initial_model]
-        chain = [initial_model]
-        for model in self.fallback_chain:
-            if model not in chain: chain.append(model)
-        return chain
-
-    @traceable(run_type="chain", name="execute_model_attempt")
-    async def _generate_with_model(
-        self,
-        model_name: str,
-        query: str,
-        context: str
-    ) -> Dict[str, Any]:
-        """Generate answer with strict portfolio-only constraints."""
+    def _build_attempt_chain(self, initial_model: str, optimize_for: str) -> Tuple[str, ...]:
+        key = (initial_model, optimize_for)
+        try:
+            return self._chain_cache[key]
+        except KeyError:
+            pass
+        if optimize_for == "quality":
+            candidates = [initial_model]
+        else:
+            # Order-preserving dedup of initial model + fallbacks
+            candidates = dict.fromkeys([initial_model, *self.fallback_chain])
         
-        # STRICT SYSTEM PROMPT
-        system_instruction = """You are a specialized assistant for Adarsh Kesharwani's portfolio.
-STRICT RULES:
-1. Use ONLY the provided Context below to answer the question.
-2. If the answer is NOT in the Context, you MUST say: "I cannot find this information in Adarsh's portfolio documents."
-3. Do NOT use outside knowledge. Do NOT answer general questions (like "what is the capital of France").
-4. Keep the answer professional and relevant to the provided documents.
-"""
+        # Models without an initialized provider would only fail inside the loop
+        providers = self.multi_llm.providers
+        chain = tuple(m for m in candidates if m in providers)
+        if not chain:
+            raise ValueError(
+                f"No initialized provider for '{initial_model}' or its fallbacks "
+                f"(optimize_for={optimize_for})"
+            )
+        self._chain_cache[key] = chain
+        return chain
 
+    @staticmethod
+    def _build_prompt(query: str, context: str) -> str:
+        """Render the generation prompt (identical for every attempt in a request)."""
+        if len(context) > MAX_CONTEXT_CHARS:
+            context = context[:MAX_CONTEXT_CHARS]
         # Combine into the prompt string (since MultiProviderLLM takes a raw string)
-        final_prompt = f"""{system_instruction}
+        return f"""{PORTFOLIO_SYSTEM_PROMPT}
 
 Context:
-{context[:3000]}
+{context}
 
 Question: {query}
 
 Answer:"""
 
+    @traceable(run_type="chain", name="execute_model_attempt")
+    async def _generate_with_model(
+        self,
+        model_name: str,
+        prompt: str
+    ) -> Dict[str, Any]:
+        """Generate answer with strict portfolio-only constraints."""
         return await self.multi_llm.generate(
             model_name=model_name,
-            prompt=final_prompt,
+            prompt=prompt,
             max_tokens=1024,
             temperature=0.3 
         )
@@ -168,11 +229,15 @@ Answer:"""
         context: str
     ) -> float:
         """Judge answer quality."""
-        # Use existing judge from GroqLLM
-        evaluation = await asyncio.to_thread(
-            self.judge_llm.judge_answer,
-            query=query,
-            answer=answer,
-            context=[{"content": context}]
+        # Use existing judge from GroqLLM, on the dedicated judge pool
+        loop = asyncio.get_running_loop()
+        evaluation = await loop.run_in_executor(
+            self._judge_pool,
+            functools.partial(
+                self.judge_llm.judge_answer,
+                query=query,
+                answer=answer,
+                context=[{"content": context}]
+            )
         )
         return float(evaluation.get("score", 0.5))
\ No newline at end of file
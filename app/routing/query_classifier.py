@@ -1,10 +1,34 @@
+import functools
 import re
 from dataclasses import dataclass
 import logging
 from app.models.model_config import MultiModelConfig
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 logger = logging.getLogger("rag_llm_system")
 
+REASONING_KEYWORDS = ("why", "how", "explain", "reason", "analyze", "compare")
+TECHNICAL_KEYWORDS = ("code", "debug", "function", "api", "error")
+
+
+@functools.lru_cache(maxsize=1)
+def _build_automaton():
+    """Keyword automaton shared by every classifier (None without pyahocorasick)."""
+    if not AHOCORASICK_AVAILABLE:
+        return None
+    automaton = ahocorasick.Automaton()
+    for kw in REASONING_KEYWORDS:
+        automaton.add_word(kw, ("reason", kw))
+    for kw in TECHNICAL_KEYWORDS:
+        automaton.add_word(kw, ("tech", kw))
+    automaton.make_automaton()
+    return automaton
+
 @dataclass
 class QueryClassification:
     complexity_score: float
@@ -19,6 +43,28 @@ class QueryClassifier:
     def __init__(self, model_config: MultiModelConfig):
         self.model_config = model_config
         self.complexity_thresholds = model_config.get_complexity_thresholds()
+        # Thresholds are fixed once the config is loaded; resolve them up front
+        self._simple_threshold = float(self.complexity_thresholds.get("simple", 0.3))
+        self._medium_threshold = float(self.complexity_thresholds.get("medium", 0.6))
+        # One automaton matches every keyword in a single pass over the query
+        self._automaton = _build_automaton()
+
+    def _keyword_hits(self, query_lower: str):
+        """Return (distinct reasoning keywords found, any technical keyword found)."""
+        if self._automaton is None:
+            reasoning_hits = sum(1 for kw in REASONING_KEYWORDS if kw in query_lower)
+            tech_hit = any(kw in query_lower for kw in TECHNICAL_KEYWORDS)
+            return reasoning_hits, tech_hit
+        
+        # Substring semantics as before: each keyword counts once, wherever it occurs
+        reasoning_found = set()
+        tech_hit = False
+        for _, (bucket, kw) in self._automaton.iter(query_lower):
+            if bucket == "reason":
+                reasoning_found.add(kw)
+            else:
+                tech_hit = True
+        return len(reasoning_found), tech_hit
 
     def classify(self, query: str) -> QueryClassification:
         query_lower = query.lower()
@@ -27,23 +73,22 @@ class QueryClassifier:
         word_count = len(query.split())
         length_score = min(word_count / 50, 0.3)
 
+        reasoning_hits, tech_hit = self._keyword_hits(query_lower)
+
         # 2. Reasoning Score
-        reasoning_keywords = ["why", "how", "explain", "reason", "analyze", "compare"]
-        reasoning_score = 0.15 * sum(1 for kw in reasoning_keywords if kw in query_lower)
-        reasoning_score = min(reasoning_score, 0.3)
+        reasoning_score = min(0.15 * reasoning_hits, 0.3)
 
         # 3. Technical Score
-        technical_keywords = ["code", "debug", "function", "api", "error"]
-        technical_score = 0.1 if any(kw in query_lower for kw in technical_keywords) else 0
+        technical_score = 0.1 if tech_hit else 0
 
         # 4. Domain & Complexity
         complexity_score = min(length_score + reasoning_score + technical_score, 1.0)
 
         # Determine Difficulty
-        if complexity_score < self.complexity_thresholds.get("simple", 0.3):
+        if complexity_score < self._simple_threshold:
             difficulty = "simple"
             preferred_model = "phi3_mini"
-        elif complexity_score < self.complexity_thresholds.get("medium", 0.6):
+        elif complexity_score < self._medium_threshold:
             difficulty = "medium"
             preferred_model = "llama3_8b"
         else:
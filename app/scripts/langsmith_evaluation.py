@@ -1,13 +1,16 @@
 import sys
 from pathlib import Path
 
-try:
-    from langsmith import Client as LangSmithClient
-except ImportError:
+from app.monitoring.langsmith_integration import (
+    LANGSMITH_AVAILABLE,
+    LangSmithRAGIntegration,
+    get_langsmith_client,
+)
+
+if not LANGSMITH_AVAILABLE:
     print("Error: langsmith not installed. Run: pip install langsmith")
     sys.exit(1)
 
-from app.monitoring.langsmith_integration import LangSmithRAGIntegration
 from app.monitoring.langsmith_evaluators import (
     retrieval_precision_evaluator,
     retrieval_recall_evaluator,
@@ -47,7 +50,7 @@ def run_rag_experiment(dataset_id: str, target_func, experiment_prefix: str = "r
         experiment_prefix: Prefix for experiment name
     """
     try:
-        client = LangSmithClient(api_key=settings.langsmith_api_key)
+        client = get_langsmith_client(settings.langsmith_api_key)
         
         evaluators = [
             retrieval_precision_evaluator,
@@ -1,6 +1,7 @@
 """Vector database module."""
 
-from app.vector.store import VectorStore
+from app.vector.store import SearchResults, VectorStore
 from app.vector.retriever import Retriever
+from app.vector.rag_cache import RAGResultCache, SemanticCache
 
-__all__ = ["VectorStore", "Retriever"]
+__all__ = ["VectorStore", "SearchResults", "Retriever", "RAGResultCache", "SemanticCache"]
@@ -0,0 +1,267 @@
+"""
+Semantic caching for retrieval and full RAG results.
+
+SemanticCache matches repeated queries exactly and near-duplicate queries
+by embedding similarity; RAGResultCache uses it to serve whole pipeline
+results (documents and answer) without retrieval or generation.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("rag_llm_system")
+
+SEMANTIC_HIT_THRESHOLD = 0.95  # cosine similarity
+LSH_TABLES = 4
+LSH_BITS = 8
+
+# Full-result cache settings
+RESULT_CACHE_SIZE = 512
+RESULT_CACHE_TTL_S = 600
+
+
+class SemanticCache:
+    """
+    Two-tier query cache: exact (query, params) LRU plus a semantic tier.
+    
+    The semantic tier indexes normalized query embeddings with random
+    hyperplane LSH (several small tables for recall) and confirms candidates
+    with an exact cosine check. Only entries with equal params can match.
+    Entries expire after a TTL and whenever the caller's version changes
+    (e.g. documents added to or cleared from the vector store).
+    """
+    
+    def __init__(
+        self,
+        max_size: int = 256,
+        ttl_s: float = 300,
+        threshold: float = SEMANTIC_HIT_THRESHOLD,
+        tables: int = LSH_TABLES,
+        bits: int = LSH_BITS,
+        seed: int = 0,
+    ):
+        self.max_size = max_size
+        self.ttl_s = ttl_s
+        self.threshold = threshold
+        self._tables = tables
+        self._bits = bits
+        self._rng = np.random.default_rng(seed)
+        self._planes: Optional[np.ndarray] = None  # (tables * bits, dim), built on first use
+        self._weights = 1 << np.arange(bits)
+        
+        # (query, params) -> (created, version, unit embedding, signatures, value)
+        self._entries: "OrderedDict[Tuple[str, tuple], tuple]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, int], set] = {}
+        self._lock = threading.Lock()
+        self.hits_exact = 0
+        self.hits_semantic = 0
+        self.misses = 0
+    
+    def _signatures(self, unit: np.ndarray) -> Tuple[int, ...]:
+        if self._planes is None or self._planes.shape[1] != unit.size:
+            self._planes = self._rng.standard_normal(
+                (self._tables * self._bits, unit.size), dtype=np.float32
+            )
+            self._entries.clear()
+            self._buckets.clear()
+        bits = (self._planes @ unit > 0).reshape(self._tables, self._bits)
+        return tuple(int(code) for code in bits @ self._weights)
+    
+    def _is_live(self, entry: tuple, version: int) -> bool:
+        return entry[1] == version and time.monotonic() - entry[0] < self.ttl_s
+    
+    def _drop(self, key: Tuple[str, tuple]) -> None:
+        entry = self._entries.pop(key)
+        for table, sig in enumerate(entry[3]):
+            bucket = self._buckets.get((table, sig))
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[(table, sig)]
+    
+    def get_exact(self, query: str, params: tuple, version: int) -> Optional[Any]:
+        key = (query, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if not self._is_live(entry, version):
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            self.hits_exact += 1
+            return entry[4]
+    
+    def get_similar(
+        self, embedding: List[float], params: tuple, version: int
+    ) -> Optional[Any]:
+        unit = _unit(embedding)
+        with self._lock:
+            candidates = set()
+            for table, sig in enumerate(self._signatures(unit)):
+                candidates.update(self._buckets.get((table, sig), ()))
+            
+            best_key, best_sim = None, self.threshold
+            for key in candidates:
+                if key[1] != params:
+                    continue
+                entry = self._entries[key]
+                if not self._is_live(entry, version):
+                    self._drop(key)
+                    continue
+                sim = float(entry[2] @ unit)
+                if sim >= best_sim:
+                    best_key, best_sim = key, sim
+            
+            if best_key is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best_key)
+            self.hits_semantic += 1
+            return self._entries[best_key][4]
+    
+    def put(
+        self,
+        query: str,
+        params: tuple,
+        version: int,
+        embedding: List[float],
+        value: Any,
+    ) -> None:
+        key = (query, params)
+        unit = _unit(embedding)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            sigs = self._signatures(unit)
+            self._entries[key] = (time.monotonic(), version, unit, sigs, value)
+            for table, sig in enumerate(sigs):
+                self._buckets.setdefault((table, sig), set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._drop(next(iter(self._entries)))
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits_exact + self.hits_semantic + self.misses
+        return {
+            "size": len(self._entries),
+            "hits_exact": self.hits_exact,
+            "hits_semantic": self.hits_semantic,
+            "misses": self.misses,
+            "hit_rate": (self.hits_exact + self.hits_semantic) / lookups if lookups else 0.0,
+        }
+
+
+def _unit(embedding: List[float]) -> np.ndarray:
+    """L2-normalize an embedding so cosine similarity is a dot product.
+    
+    float32 halves cache memory and the bytes moved per similarity check;
+    its precision is far finer than the semantic hit threshold.
+    """
+    vec = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm > 0 else vec
+
+
+class RAGResultCache:
+    """
+    Cache of complete RAG results keyed on the query embedding.
+    
+    A hit bypasses both vector search and LLM generation. Entries are
+    isolated by a config hash (embedding model plus retrieval/generation
+    settings) so results never leak across configurations, and expire by
+    TTL or when the vector store version changes.
+    """
+    
+    def __init__(
+        self,
+        embedding_generator,
+        max_size: int = RESULT_CACHE_SIZE,
+        ttl_s: float = RESULT_CACHE_TTL_S,
+        threshold: float = SEMANTIC_HIT_THRESHOLD,
+    ):
+        """
+        Initialize result cache.
+        
+        Args:
+            embedding_generator: Embedder used for query embeddings
+            max_size: Maximum cached results
+            ttl_s: Entry lifetime in seconds
+            threshold: Minimum cosine similarity for a semantic hit
+        """
+        self.embedding_generator = embedding_generator
+        self._cache = SemanticCache(max_size=max_size, ttl_s=ttl_s, threshold=threshold)
+        logger.info(f"RAG result cache initialized (size={max_size}, ttl={ttl_s}s)")
+    
+    def config_key(self, **config: Any) -> str:
+        """Hash the settings that affect a result, including the embedding model."""
+        items = sorted(config.items())
+        items.append(("embedding_model", getattr(self.embedding_generator, "model_name", "")))
+        return blake2b(repr(items).encode("utf-8"), digest_size=8).hexdigest()
+    
+    def lookup(self, query: str, config_key: str, version: int = 0) -> Optional[Dict[str, Any]]:
+        """
+        Find a cached result for this query or a near-duplicate.
+        
+        Args:
+            query: User query
+            config_key: Result of config_key()
+            version: Vector store version
+            
+        Returns:
+            Cached entry ({"docs", "answer", "response", "ts", "hits"}) or None
+        """
+        params = (config_key,)
+        entry = self._cache.get_exact(query, params, version)
+        if entry is None:
+            embedding = self.embedding_generator.embed_query(query)
+            entry = self._cache.get_similar(embedding, params, version)
+        if entry is not None:
+            entry["hits"] += 1
+        return entry
+    
+    def store(
+        self,
+        query: str,
+        config_key: str,
+        docs: List[Dict[str, Any]],
+        response: Dict[str, Any],
+        version: int = 0,
+    ) -> None:
+        """
+        Cache a completed result.
+        
+        Args:
+            query: User query
+            config_key: Result of config_key()
+            docs: Retrieved documents
+            response: Response payload returned to the client
+            version: Vector store version the docs came from
+        """
+        embedding = self.embedding_generator.embed_query(query)
+        entry = {
+            "docs": docs,
+            "answer": response.get("answer"),
+            "response": response,
+            "ts": time.time(),
+            "hits": 0,
+        }
+        self._cache.put(query, (config_key,), version, embedding, entry)
+    
+    def clear(self) -> None:
+        """Drop all cached results."""
+        self._cache.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Cache size and hit/miss counters."""
+        return self._cache.stats()
@@ -3,13 +3,34 @@ Retrieval utilities for fetching relevant documents.
 """
 
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
 from app.vector.store import VectorStore
+from app.vector.rag_cache import SemanticCache
 from app.ingestion.embedder import EmbeddingGenerator
 from langsmith import traceable
 
 logger = logging.getLogger("rag_llm_system")
 
+# Retrieval cache settings
+RETRIEVAL_CACHE_SIZE = 256
+RETRIEVAL_CACHE_TTL_S = 300
+
+# Greetings and acknowledgements that never benefit from document context
+_FILLER_SET = frozenset({
+    "hi", "hello", "hey", "yo", "thanks", "thank you", "thx", "ok", "okay",
+    "cool", "great", "nice", "bye", "goodbye", "yes", "no", "sure",
+})
+MIN_QUERY_CHARS = 3
+
+
+def _worth_retrieving(query: str) -> bool:
+    """Cheap gate: reject empty, punctuation-only and filler queries."""
+    normalized = query.strip().lower().rstrip("!.?")
+    if len(normalized) < MIN_QUERY_CHARS or normalized in _FILLER_SET:
+        return False
+    return any(c.isalnum() for c in normalized)
+
 
 class Retriever:
     """Retrieve relevant documents from vector store."""
@@ -28,10 +49,14 @@ class Retriever:
         """
         self.vector_store = vector_store
         self.embedding_generator = embedding_generator
+        self._cache = SemanticCache(
+            max_size=RETRIEVAL_CACHE_SIZE, ttl_s=RETRIEVAL_CACHE_TTL_S
+        )
+        self._skipped = 0
 
     @traceable(run_type="retriever", name="chroma_retrieval")
     def retrieve(
-        self, query: str, k: int = 5
+        self, query: str, k: int = 5, distance_threshold: Optional[float] = None
     ) -> List[Dict[str, Any]]:
         """
         Retrieve relevant documents for a query.
@@ -39,24 +64,54 @@ class Retriever:
         Args:
             query: Query text
             k: Number of documents to retrieve
+            distance_threshold: (Optional) Maximum distance to include
             
         Returns:
             List of relevant documents
         """
+        if not _worth_retrieving(query):
+            self._skipped += 1
+            logger.info(f"⏭️ Skipping retrieval for trivial query: {query[:100]!r}")
+            return []
+
         logger.info(f"Retrieving {k} documents for query: {query[:100]}")
         try:
+            version = getattr(self.vector_store, "version", 0)
+            params = (k, distance_threshold)
+            
+            # Exact repeat: skip both embedding and search
+            results = self._cache.get_exact(query, params, version)
+            if results is not None:
+                logger.info(f"Retrieved {len(results)} documents (cache hit)")
+                return [dict(r) for r in results]
+
             # Generate query embedding
             query_embedding = self.embedding_generator.embed_query(query)
 
-            # Search vector store
-            results = self.vector_store.search(query_embedding, k=k)
+            # Near-duplicate query: reuse its results, otherwise search
+            results = self._cache.get_similar(query_embedding, params, version)
+            if results is None:
+                results = self.vector_store.search(
+                    query_embedding, k=k, distance_threshold=distance_threshold
+                )
+            else:
+                logger.info("Semantic retrieval cache hit")
+            self._cache.put(query, params, version, query_embedding, results)
 
             logger.info(f"Retrieved {len(results)} documents")
-            return results
+            return [dict(r) for r in results]
         except Exception as e:
             logger.error(f"Retrieval failed: {str(e)}")
             raise
 
+    def clear_cache(self) -> None:
+        """Drop all cached retrieval results."""
+        self._cache.clear()
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Retrieval cache size, hit/miss counters and skipped trivial queries."""
+        return {**self._cache.stats(), "skipped_trivial": self._skipped}
+
     def retrieve_with_threshold(
         self, query: str, k: int = 5, distance_threshold: float = 0.5
     ) -> List[Dict[str, Any]]:
@@ -75,13 +130,10 @@ class Retriever:
             f"Retrieving documents with threshold {distance_threshold}"
         )
         try:
-            results = self.retrieve(query, k=k)
-
-            # Filter by threshold
-            filtered_results = [
-                r for r in results
-                if r.get("distance", 1.0) <= distance_threshold
-            ]
+            # Threshold is applied inside the vector store search
+            filtered_results = self.retrieve(
+                query, k=k, distance_threshold=distance_threshold
+            )
 
             logger.info(
                 f"Filtered to {len(filtered_results)} documents above threshold"
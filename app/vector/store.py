@@ -4,13 +4,130 @@ Persistent storage for embeddings and document metadata.
 """
 
 import logging
-from typing import List, Optional, Dict, Any
+import os
+import threading
+from dataclasses import dataclass
+from hashlib import blake2b
+from typing import TYPE_CHECKING, List, Optional, Dict, Any, Tuple
 import chromadb
+import numpy as np
 from langchain.schema import Document
 from app.config import settings
 
+if TYPE_CHECKING:
+    from app.ingestion.embedder import EmbeddingGenerator
+
 logger = logging.getLogger("rag_llm_system")
 
+# Documents embedded and inserted per collection.add call
+ADD_BATCH_SIZE = 512
+
+# One Chroma client per database path for the lifetime of the process
+_CLIENTS: Dict[str, Any] = {}
+# Collection handle and write version per (database path, collection name),
+# shared so every VectorStore on the same collection sees the others' writes
+_COLLECTIONS: Dict[Tuple[str, str], "_SharedCollection"] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+class _SharedCollection:
+    """Collection handle and write version shared by VectorStores on one collection."""
+
+    __slots__ = ("client", "name", "handle", "version")
+
+    def __init__(self, client, name: str):
+        self.client = client
+        self.name = name
+        self.handle = None  # created on first use, dropped when deleted
+        self.version = 0
+
+    def get(self):
+        """The live collection, (re)created if missing."""
+        with _CLIENTS_LOCK:
+            if self.handle is None:
+                self.handle = self.client.get_or_create_collection(
+                    name=self.name,
+                    metadata={"hnsw:space": "cosine"},
+                )
+            return self.handle
+
+    def bump(self) -> None:
+        """Record a write so retrieval caches can detect stale results."""
+        with _CLIENTS_LOCK:
+            self.version += 1
+
+    def drop(self) -> None:
+        """Delete the collection; the next get() starts an empty one."""
+        with _CLIENTS_LOCK:
+            self.client.delete_collection(name=self.name)
+            self.handle = None
+            self.version += 1
+
+
+def _get_client(db_path: str):
+    """Return the shared PersistentClient for a database path."""
+    key = os.path.abspath(db_path)
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            chromadb.utils.embedding_functions.DEFAULT_TELEMETRY = False
+            client = chromadb.PersistentClient(path=db_path)
+            _CLIENTS[key] = client
+        return client
+
+
+def _get_collection(db_path: str, collection_name: str) -> _SharedCollection:
+    """Return the shared collection state for a database path and name."""
+    client = _get_client(db_path)
+    key = (os.path.abspath(db_path), collection_name)
+    with _CLIENTS_LOCK:
+        shared = _COLLECTIONS.get(key)
+        if shared is None:
+            shared = _SharedCollection(client, collection_name)
+            _COLLECTIONS[key] = shared
+    shared.get()
+    return shared
+
+
+def _doc_id(text: str) -> str:
+    """Content-derived document id, stable across processes and installs."""
+    return "doc_" + blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+@dataclass(slots=True)
+class SearchResults:
+    """Parallel result columns from one query, nearest first."""
+
+    ids: List[str]
+    distances: np.ndarray
+    documents: List[str]
+    metadatas: List[Dict[str, Any]]
+
+    def __len__(self) -> int:
+        return self.distances.size
+
+    def within(self, distance_threshold: Optional[float]) -> "SearchResults":
+        """Keep the results at or below a distance threshold."""
+        if distance_threshold is None:
+            return self
+        # Distances are sorted ascending, so the cut is a single binary search
+        end = int(np.searchsorted(self.distances, distance_threshold, side="right"))
+        if end == len(self):
+            return self
+        return SearchResults(
+            self.ids[:end], self.distances[:end],
+            self.documents[:end], self.metadatas[:end],
+        )
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Per-document dicts in the shape returned by VectorStore.search."""
+        return [
+            {"content": doc, "metadata": metadata, "distance": distance}
+            for doc, metadata, distance in zip(
+                self.documents, self.metadatas, self.distances.tolist()
+            )
+        ]
+
 
 class VectorStore:
     """Manage vector database operations with Chroma."""
@@ -29,57 +146,83 @@ class VectorStore:
         """
         logger.info(f"Initializing Chroma vector store at {db_path}")
         try:
-            chromadb.utils.embedding_functions.DEFAULT_TELEMETRY = False
-            self.client = chromadb.PersistentClient(path=db_path)
-            self.collection = self.client.get_or_create_collection(
-                name=collection_name,
-                metadata={"hnsw:space": "cosine"},
-            )
+            # Reuse the process-wide client and collection state instead of
+            # reopening the store
+            self._shared = _get_collection(db_path, collection_name)
+            self.client = self._shared.client
             self.collection_name = collection_name
+            self._embedder = None
             logger.info(f"Vector store initialized with collection: {collection_name}")
         except Exception as e:
             logger.error(f"Failed to initialize vector store: {str(e)}")
             raise
 
-    def add_documents(self, documents: List[Document]) -> None:
+    @property
+    def collection(self):
+        """Live Chroma collection (shared with other stores on the same path)."""
+        return self._shared.get()
+
+    @property
+    def version(self) -> int:
+        """Bumped on every write by any VectorStore on this collection."""
+        return self._shared.version
+
+    def add_documents(
+        self,
+        documents: List[Document],
+        embedding_generator: Optional["EmbeddingGenerator"] = None,
+    ) -> None:
         """
         Add documents to the vector store.
         
         Args:
-            documents: List of documents with embeddings
+            documents: List of documents to embed and store
+            embedding_generator: Embedder to use (a shared default is created if omitted)
         """
         logger.info(f"Adding {len(documents)} documents to vector store")
+        if not documents:
+            return
         try:
-            ids = []
-            embeddings = []
-            documents_text = []
-            metadatas = []
-
-            for i, doc in enumerate(documents):
-                from app.ingestion.embedder import EmbeddingGenerator
-                embedder = EmbeddingGenerator()
-                embedding = embedder.embed_query(doc.page_content)
-
-                doc_id = f"doc_{hash(doc.page_content) % 10**8}"
-                ids.append(doc_id)
-                embeddings.append(embedding)
-                documents_text.append(doc.page_content)
-                metadatas.append(doc.metadata or {})
-
-            self.collection.add(
-                ids=ids,
-                embeddings=embeddings,
-                documents=documents_text,
-                metadatas=metadatas,
-            )
+            embedder = embedding_generator or self._get_embedder()
+
+            # Stable content ids; identical chunks within a batch are stored once
+            by_id = {}
+            for doc in documents:
+                by_id.setdefault(_doc_id(doc.page_content), doc)
+            ids = list(by_id)
+            documents_text = [doc.page_content for doc in by_id.values()]
+            metadatas = [doc.metadata or {} for doc in by_id.values()]
+
+            # Embed and insert in bounded batches: one forward pass per batch
+            # instead of per chunk, without holding every embedding at once
+            for start in range(0, len(ids), ADD_BATCH_SIZE):
+                end = start + ADD_BATCH_SIZE
+                batch_text = documents_text[start:end]
+                self.collection.add(
+                    ids=ids[start:end],
+                    embeddings=embedder.embed_documents(batch_text),
+                    documents=batch_text,
+                    metadatas=metadatas[start:end],
+                )
+                self._shared.bump()
 
-            logger.info(f"Successfully added {len(documents)} documents")
+            logger.info(f"Successfully added {len(ids)} documents")
         except Exception as e:
             logger.error(f"Failed to add documents: {str(e)}")
             raise
 
+    def _get_embedder(self) -> "EmbeddingGenerator":
+        """Lazily create one embedder for callers that don't pass their own."""
+        if self._embedder is None:
+            from app.ingestion.embedder import EmbeddingGenerator
+            self._embedder = EmbeddingGenerator()
+        return self._embedder
+
     def search(
-        self, query_embedding: List[float], k: int = 5
+        self,
+        query_embedding: List[float],
+        k: int = 5,
+        distance_threshold: Optional[float] = None,
     ) -> List[Dict[str, Any]]:
         """
         Search for similar documents.
@@ -87,9 +230,31 @@ class VectorStore:
         Args:
             query_embedding: Query embedding vector
             k: Number of results to return
+            distance_threshold: (Optional) Maximum distance to include
             
         Returns:
-            List of similar documents with metadata
+            List of similar documents with metadata, nearest first
+        """
+        return self.search_results(
+            query_embedding, k=k, distance_threshold=distance_threshold
+        ).to_dicts()
+
+    def search_results(
+        self,
+        query_embedding: List[float],
+        k: int = 5,
+        distance_threshold: Optional[float] = None,
+    ) -> SearchResults:
+        """
+        Search for similar documents, returning columnar results.
+        
+        Args:
+            query_embedding: Query embedding vector
+            k: Number of results to return
+            distance_threshold: (Optional) Maximum distance to include
+            
+        Returns:
+            SearchResults with distances as a float64 array, nearest first
         """
         try:
             results = self.collection.query(
@@ -97,18 +262,15 @@ class VectorStore:
                 n_results=k,
             )
 
-            formatted_results = []
-            if results and results["documents"]:
-                for i, doc in enumerate(results["documents"][0]):
-                    formatted_results.append(
-                        {
-                            "content": doc,
-                            "metadata": results["metadatas"][0][i],
-                            "distance": results["distances"][0][i],
-                        }
-                    )
-
-            return formatted_results
+            if not results or not results["documents"]:
+                return SearchResults([], np.empty(0), [], [])
+
+            return SearchResults(
+                ids=results["ids"][0],
+                distances=np.asarray(results["distances"][0], dtype=np.float64),
+                documents=results["documents"][0],
+                metadatas=results["metadatas"][0],
+            ).within(distance_threshold)
         except Exception as e:
             logger.error(f"Search failed: {str(e)}")
             raise
@@ -117,7 +279,7 @@ class VectorStore:
         """Delete the current collection."""
         logger.warning(f"Deleting collection: {self.collection_name}")
         try:
-            self.client.delete_collection(name=self.collection_name)
+            self._shared.drop()
             logger.info("Collection deleted successfully")
         except Exception as e:
             logger.error(f"Failed to delete collection: {str(e)}")
@@ -127,10 +289,9 @@ class VectorStore:
         """Clear all documents from the collection."""
         logger.warning("Clearing all documents from collection")
         try:
-            # Get all IDs and delete them
-            results = self.collection.get()
-            if results and results["ids"]:
-                self.collection.delete(ids=results["ids"])
+            # Drop and recreate instead of fetching every id to delete row by row
+            self._shared.drop()
+            self._shared.get()
             logger.info("Collection cleared successfully")
         except Exception as e:
             logger.error(f"Failed to clear collection: {str(e)}")
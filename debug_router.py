@@ -4,7 +4,6 @@ import sys
 from dotenv import load_dotenv
 from app.models.model_config import MultiModelConfig
 from app.routing.model_router import CostAwareRouter
-from app.llm.multi_provider import MultiProviderLLM
 
 # Setup basic logging to console
 import logging
@@ -46,24 +45,27 @@ async def test_routing_logic():
 
     # 3. Test Connections (Ping Providers)
     print("\nTesting Model Providers...")
-    llm = MultiProviderLLM(config)
+    # Reuse the router's providers instead of initializing a second set
+    llm = router.multi_llm
     
-    # Test Local Ollama (Phi3)
+    # Probe Local Ollama (Phi3) and Cloud Groq (Llama3) concurrently
+    ollama_res, groq_res = await asyncio.gather(
+        llm.generate("phi3_mini", "Hi", max_tokens=5),
+        llm.generate("llama3_8b", "Hi", max_tokens=5),
+        return_exceptions=True,
+    )
+
     print("\n--- Testing Local Ollama (phi3_mini) ---")
-    try:
-        # Simple ping prompt
-        response = await llm.generate("phi3_mini", "Hi", max_tokens=5)
-        print(f"✅ Ollama Success: {response['answer']}")
-    except Exception as e:
-        print(f"❌ Ollama Failed. Is 'ollama serve' running? Error: {str(e)[:100]}...")
+    if isinstance(ollama_res, Exception):
+        print(f"❌ Ollama Failed. Is 'ollama serve' running? Error: {str(ollama_res)[:100]}...")
+    else:
+        print(f"✅ Ollama Success: {ollama_res['answer']}")
 
-    # Test Cloud (Llama3)
     print("\n--- Testing Cloud Groq (llama3_8b) ---")
-    try:
-        response = await llm.generate("llama3_8b", "Hi", max_tokens=5)
-        print(f"✅ Groq Success: {response['answer']}")
-    except Exception as e:
-        print(f"❌ Groq Failed. Check API Key/Status. Error: {str(e)[:100]}...")
+    if isinstance(groq_res, Exception):
+        print(f"❌ Groq Failed. Check API Key/Status. Error: {str(groq_res)[:100]}...")
+    else:
+        print(f"✅ Groq Success: {groq_res['answer']}")
 
     # 4. Test Full Routing
     print("\n" + "="*50)
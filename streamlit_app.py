@@ -3,16 +3,29 @@ Production-Ready Streamlit UI for RAG + LLM System
 Provides complete interface for document management and querying.
 """
 
+import asyncio
+from collections import deque
+from itertools import islice
 import streamlit as st
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
 import json
+import shutil
+import tempfile
 import time
 from datetime import datetime
 from pathlib import Path
-import pandas as pd
-import plotly.graph_objects as go
+from typing import TYPE_CHECKING
+import numpy as np
 import logging
 
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+# pandas and plotly are imported where first used, so a fresh session
+# paints without loading them until there is data to show
+
 logger = logging.getLogger("rag_llm_system")
 
 # ============================================================================
@@ -41,6 +54,27 @@ QUERY_ENDPOINT = f"{API_BASE_URL}/query"
 INGEST_ENDPOINT = f"{API_BASE_URL}/ingest"
 CACHE_CLEAR_ENDPOINT = f"{API_BASE_URL}/cache/clear"
 
+# Uploads are staged here before ingestion (absolute, so the API can read them)
+TEMP_DIR = Path(tempfile.gettempdir()) / "ragapp"
+TEMP_DIR.mkdir(exist_ok=True)
+UPLOAD_CHUNK_BYTES = 1 << 20
+
+# How often the header re-checks API health on its own
+HEALTH_REFRESH_S = 15
+
+# Conversation history entries rendered per page, and kept per session
+HISTORY_PAGE_SIZE = 20
+HISTORY_MAX_ITEMS = 200
+
+MAIN_TABS = ["💬 Query", "📄 Documents", "📊 Analytics", "⚙️ Settings", "ℹ️ Help"]
+UPLOAD_TYPES = ["pdf", "txt", "md"]
+
+INGESTION_STATS_MARKDOWN = (
+    "| Total Documents | Total Chunks | Vector Dimension | Storage Size |\n"
+    "|---|---|---|---|\n"
+    "| 0 | 0 | 384 | 0 MB |"
+)
+
 # ============================================================================
 # CUSTOM CSS & STYLING
 # ============================================================================
@@ -104,7 +138,10 @@ if "api_health" not in st.session_state:
     st.session_state.api_health = None
 
 if "conversation_history" not in st.session_state:
-    st.session_state.conversation_history = []
+    st.session_state.conversation_history = deque(maxlen=HISTORY_MAX_ITEMS)
+
+if "history_window" not in st.session_state:
+    st.session_state.history_window = HISTORY_PAGE_SIZE
 
 if "session_id" not in st.session_state:
     st.session_state.session_id = f"session_{int(time.time())}"
@@ -114,24 +151,85 @@ if "query_stats" not in st.session_state:
         "total_queries": 0,
         "cache_hits": 0,
         "avg_processing_time": 0,
-        "avg_quality_score": 0
+        "avg_quality_score": 0,
+        "scored_queries": 0
     }
 
 # ============================================================================
 # UTILITY FUNCTIONS
 # ============================================================================
 
+def fragment(**kwargs):
+    """st.fragment when available (experimental before 1.37), else a no-op."""
+    impl = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+    if impl is None:
+        return lambda func: func
+    return impl(**kwargs)
+
+
 @st.cache_resource
+def get_http() -> requests.Session:
+    """Shared HTTP session so API calls reuse pooled keep-alive connections."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"Connection": "keep-alive"})
+    return session
+
+
+async def _probe(client: httpx.AsyncClient, path: str):
+    """GET a JSON endpoint; None on a non-200 response."""
+    response = await client.get(path)
+    if response.status_code == 200:
+        return response.json()
+    return None
+
+
+async def _fetch_backend_status():
+    """Probe health and cache stats concurrently."""
+    async with httpx.AsyncClient(base_url=API_BASE_URL, timeout=1) as client:
+        return await asyncio.gather(
+            _probe(client, "/health"),
+            _probe(client, "/cache/stats"),
+            return_exceptions=True,
+        )
+
+
+@st.cache_data(ttl=15, show_spinner=False)
+def fetch_backend_status() -> dict:
+    """
+    Backend health and cache stats, re-checked at most every 15s.
+    
+    Failures are cached too, so a hung API costs one 1s probe per TTL
+    rather than one per caller and rerun. ``error`` describes a failed
+    health probe and ``timed_out`` marks timeouts; cache stats are
+    best-effort and None when unavailable.
+    """
+    health, cache_stats = asyncio.run(_fetch_backend_status())
+    error, timed_out = None, False
+    if isinstance(health, Exception):
+        error = str(health) or type(health).__name__
+        timed_out = isinstance(health, httpx.TimeoutException)
+        health = None
+    if isinstance(cache_stats, Exception):
+        cache_stats = None
+    return {"health": health, "cache_stats": cache_stats, "error": error, "timed_out": timed_out}
+
+
 def check_api_health():
     """Check API health status."""
-    try:
-        response = requests.get(HEALTH_ENDPOINT, timeout=5)
-        if response.status_code == 200:
-            return response.json()
-        return None
-    except Exception as e:
-        st.error(f"API Health Check Failed: {str(e)}")
+    status = fetch_backend_status()
+    # Reused by the sidebar so it doesn't probe the API again
+    st.session_state.backend_status = status
+    if status["timed_out"]:
+        # Slow API: keep showing the last known state instead of blocking
+        return st.session_state.get("last_api_health")
+    if status["error"]:
+        st.error(f"API Health Check Failed: {status['error']}")
         return None
+    st.session_state.last_api_health = status["health"]
+    return status["health"]
 
 
 def send_query(query: str, user_id: str = "streamlit_user") -> dict:
@@ -143,7 +241,7 @@ def send_query(query: str, user_id: str = "streamlit_user") -> dict:
             "user_id": user_id
         }
         
-        response = requests.post(QUERY_ENDPOINT, json=payload, timeout=30)
+        response = get_http().post(QUERY_ENDPOINT, json=payload, timeout=30)
         
         if response.status_code == 200:
             return response.json()
@@ -159,7 +257,7 @@ def ingest_document(file_path: str) -> dict:
     """Ingest document into the system."""
     try:
         payload = {"file_path": file_path}
-        response = requests.post(INGEST_ENDPOINT, json=payload, timeout=60)
+        response = get_http().post(INGEST_ENDPOINT, json=payload, timeout=60)
         
         if response.status_code == 200:
             return response.json()
@@ -174,7 +272,7 @@ def ingest_document(file_path: str) -> dict:
 def clear_cache():
     """Clear API cache."""
     try:
-        response = requests.get(CACHE_CLEAR_ENDPOINT, timeout=5)
+        response = get_http().get(CACHE_CLEAR_ENDPOINT, timeout=5)
         if response.status_code == 200:
             st.success("✅ Cache cleared successfully!")
             return True
@@ -184,6 +282,34 @@ def clear_cache():
         return False
 
 
+def render_retrieved_docs(docs: list) -> None:
+    """Render retrieved documents as one table plus a single full-text expander."""
+    if not docs:
+        st.info("No documents retrieved")
+        return
+    
+    import pandas as pd
+    
+    # One Arrow-serialized table instead of a widget per document
+    df = pd.DataFrame([
+        {
+            "#": idx,
+            "distance": doc.get("distance"),
+            "content": doc.get("content", "")[:500],
+        }
+        for idx, doc in enumerate(docs, 1)
+    ])
+    st.dataframe(df, use_container_width=True, hide_index=True)
+    
+    with st.expander("📄 Full documents"):
+        parts = []
+        for idx, doc in enumerate(docs, 1):
+            parts.append(f"**Document {idx}**\n\n{doc.get('content', 'No content')}")
+            if doc.get("metadata"):
+                parts.append(f"*Metadata: {json.dumps(doc['metadata'])}*")
+        st.markdown("\n\n---\n\n".join(parts))
+
+
 def format_response(response: dict) -> None:
     """Display formatted query response."""
     if not response:
@@ -231,14 +357,7 @@ def format_response(response: dict) -> None:
     st.markdown("### 📚 Retrieved Documents")
     docs = response.get("retrieved_docs", [])
     
-    if docs:
-        for idx, doc in enumerate(docs, 1):
-            with st.expander(f"📄 Document {idx} (Relevance: {doc.get('distance', 0):.3f})"):
-                st.markdown(doc.get("content", "No content"))
-                if doc.get("metadata"):
-                    st.caption(f"Metadata: {json.dumps(doc.get('metadata', {}))}")
-    else:
-        st.info("No documents retrieved")
+    render_retrieved_docs(docs)
     
     # Judge evaluation details
     st.markdown("### 🔍 Judge Evaluation Details")
@@ -258,6 +377,94 @@ def format_response(response: dict) -> None:
                     st.write(f"- {key.capitalize()}: {value}")
 
 
+def trend_figure(key: str, values: tuple, name: str, title: str, y_title: str, color: str) -> "go.Figure":
+    """Return a cached line chart, updating its data only when the values change."""
+    import plotly.graph_objects as go
+    
+    figures = st.session_state.setdefault("trend_figures", {})
+    cached = figures.get(key)
+    if cached is not None and cached[1] == values:
+        # Unrelated rerun: skip Plotly's trace validation entirely
+        return cached[0]
+
+    if cached is None:
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            mode='lines+markers',
+            name=name,
+            line=dict(color=color)
+        ))
+        fig.update_layout(
+            title=title,
+            xaxis_title="Query Index",
+            yaxis_title=y_title,
+            hovermode='x unified'
+        )
+    else:
+        fig = cached[0]
+    fig.data[0].x = tuple(range(len(values)))
+    fig.data[0].y = values
+    figures[key] = (fig, values)
+    return fig
+
+
+def analytics_snapshot(history) -> dict:
+    """
+    Metric series and summary table for the analytics page.
+    
+    Recomputed only when the history changes, identified by its length and
+    newest timestamp; other reruns reuse the stored snapshot.
+    """
+    signature = (len(history), history[-1]["timestamp"])
+    cached = st.session_state.get("analytics_snapshot")
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    
+    import pandas as pd
+    
+    # Extract each metric into one array, then reduce with numpy
+    n = len(history)
+    processing_times = np.fromiter(
+        (item["response"].get("processing_time", 0) for item in history),
+        dtype=np.float64, count=n
+    )
+    quality_scores = np.fromiter(
+        ((item["response"].get("judge_evaluation") or {}).get("score", 0) for item in history),
+        dtype=np.float64, count=n
+    )
+    cache_hits = np.fromiter(
+        (bool(item["response"].get("cache_hit")) for item in history),
+        dtype=np.bool_, count=n
+    )
+    
+    stats_df = pd.DataFrame({
+        "Metric": [
+            "Total Queries",
+            "Cache Hit Rate",
+            "Avg Processing Time",
+            "Avg Quality Score",
+            "Min Processing Time",
+            "Max Processing Time"
+        ],
+        "Value": [
+            n,
+            f"{cache_hits.mean() * 100:.1f}%",
+            f"{processing_times.mean():.2f}s",
+            f"{quality_scores.mean():.2f}",
+            f"{processing_times.min():.2f}s",
+            f"{processing_times.max():.2f}s"
+        ]
+    })
+    
+    snapshot = {
+        "processing_times": tuple(processing_times.tolist()),
+        "quality_scores": tuple(quality_scores.tolist()),
+        "stats_df": stats_df,
+    }
+    st.session_state.analytics_snapshot = (signature, snapshot)
+    return snapshot
+
+
 def update_query_stats(response: dict) -> None:
     """Update query statistics with null safety."""
     # SAFETY: Check if response is valid
@@ -269,10 +476,11 @@ def update_query_stats(response: dict) -> None:
         logger.warning(f"Response is not dict: {type(response)}, skipping stats update")
         return
     
-    st.session_state.query_stats["total_queries"] += 1
+    stats = st.session_state.query_stats
+    stats["total_queries"] += 1
     
     if response.get("cache_hit", False):
-        st.session_state.query_stats["cache_hits"] += 1
+        stats["cache_hits"] += 1
     
     # SAFETY: Handle missing judge_evaluation
     judge_eval = response.get("judge_evaluation")
@@ -280,13 +488,10 @@ def update_query_stats(response: dict) -> None:
         processing_time = response.get("processing_time", 0)
         judge_score = judge_eval.get("score", 0)
         
-        n = st.session_state.query_stats["total_queries"]
-        st.session_state.query_stats["avg_processing_time"] = (
-            (st.session_state.query_stats["avg_processing_time"] * (n - 1) + processing_time) / n
-        )
-        st.session_state.query_stats["avg_quality_score"] = (
-            (st.session_state.query_stats["avg_quality_score"] * (n - 1) + judge_score) / n
-        )
+        # Incremental (Welford) means over the queries that were judged
+        stats["scored_queries"] = n = stats.get("scored_queries", 0) + 1
+        stats["avg_processing_time"] += (processing_time - stats["avg_processing_time"]) / n
+        stats["avg_quality_score"] += (judge_score - stats["avg_quality_score"]) / n
     else:
         logger.warning("judge_evaluation missing or invalid, using defaults")
 
@@ -300,7 +505,7 @@ def send_query(query: str, user_id: str = "streamlit_user") -> dict:
             "user_id": user_id
         }
         
-        response = requests.post(QUERY_ENDPOINT, json=payload, timeout=30)
+        response = get_http().post(QUERY_ENDPOINT, json=payload, timeout=30)
         
         if response.status_code == 200:
             return response.json()
@@ -377,14 +582,7 @@ def format_response(response: dict) -> None:
     st.markdown("### 📚 Retrieved Documents")
     docs = response.get("retrieved_docs", [])
     
-    if docs:
-        for idx, doc in enumerate(docs, 1):
-            with st.expander(f"📄 Document {idx}"):
-                st.markdown(doc.get("content", "No content"))
-                if doc.get("metadata"):
-                    st.caption(f"Metadata: {json.dumps(doc.get('metadata', {}))}")
-    else:
-        st.info("No documents retrieved")
+    render_retrieved_docs(docs)
     
     # Judge evaluation details
     st.markdown("### 🔍 Judge Evaluation Details")
@@ -410,6 +608,7 @@ def format_response(response: dict) -> None:
 # PAGE LAYOUT
 # ============================================================================
 
+@fragment(run_every=HEALTH_REFRESH_S)
 def render_header():
     """Render page header."""
     col1, col2 = st.columns([3, 1])
@@ -432,63 +631,78 @@ def render_header():
 def render_sidebar():
     """Render sidebar navigation."""
     with st.sidebar:
-        st.markdown("## ⚙️ Configuration")
-        
-        # Session info
-        st.markdown("### Session Info")
-        st.text_input(
-            "Session ID",
-            value=st.session_state.session_id,
-            disabled=True,
-            key="sid_display"
-        )
-        
-        # Query stats
-        st.markdown("### 📊 Query Statistics")
-        stats = st.session_state.query_stats
-        
-        st.metric("Total Queries", stats["total_queries"])
-        st.metric("Cache Hits", stats["cache_hits"])
-        st.metric(
-            "Avg Processing Time",
-            f"{stats['avg_processing_time']:.2f}s"
-        )
-        st.metric(
-            "Avg Quality Score",
-            f"{stats['avg_quality_score']:.2f}/1.0"
-        )
-        
-        # Actions
-        st.markdown("### 🔧 Actions")
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            if st.button("🔄 New Session", use_container_width=True):
-                st.session_state.session_id = f"session_{int(time.time())}"
-                st.session_state.conversation_history = []
-                st.rerun()
-        
-        with col2:
-            if st.button("🗑️ Clear Cache", use_container_width=True):
-                clear_cache()
-        
-        # About
-        st.markdown("---")
-        st.markdown("### ℹ️ About")
-        st.info(
-            "RAG + LLM System\n\n"
-            "**Version:** 1.0.0\n\n"
-            "**Components:**\n"
-            "- LangGraph Orchestration\n"
-            "- Vector Database (Chroma)\n"
-            "- LLM (Groq - Llama 3.1)\n"
-            "- Multi-layer Memory\n"
-            "- Quality Judge Module"
-        )
+        render_sidebar_body()
+
+
+@fragment()
+def render_sidebar_body():
+    """Sidebar contents; reruns on its own when only sidebar widgets change."""
+    st.markdown("## ⚙️ Configuration")
+    
+    # Session info
+    st.markdown("### Session Info")
+    st.text_input(
+        "Session ID",
+        value=st.session_state.session_id,
+        disabled=True,
+        key="sid_display"
+    )
+    
+    # Query stats
+    st.markdown("### 📊 Query Statistics")
+    stats = st.session_state.query_stats
+    
+    st.metric("Total Queries", stats["total_queries"])
+    st.metric("Cache Hits", stats["cache_hits"])
+    st.metric(
+        "Avg Processing Time",
+        f"{stats['avg_processing_time']:.2f}s"
+    )
+    st.metric(
+        "Avg Quality Score",
+        f"{stats['avg_quality_score']:.2f}/1.0"
+    )
+    
+    # Backend cache stats, from the header's latest health check
+    cache_stats = st.session_state.get("backend_status", {}).get("cache_stats")
+    if cache_stats:
+        st.markdown("### 💾 Backend Cache")
+        st.json(cache_stats, expanded=False)
+    
+    # Actions
+    st.markdown("### 🔧 Actions")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("🔄 New Session", use_container_width=True):
+            st.session_state.session_id = f"session_{int(time.time())}"
+            st.session_state.conversation_history = deque(maxlen=HISTORY_MAX_ITEMS)
+            st.session_state.history_window = HISTORY_PAGE_SIZE
+            st.rerun()
+    
+    with col2:
+        if st.button("🗑️ Clear Cache", use_container_width=True):
+            clear_cache()
+    
+    # About
+    st.markdown("---")
+    st.markdown("### ℹ️ About")
+    st.info(
+        "RAG + LLM System\n\n"
+        "**Version:** 1.0.0\n\n"
+        "**Components:**\n"
+        "- LangGraph Orchestration\n"
+        "- Vector Database (Chroma)\n"
+        "- LLM (Groq - Llama 3.1)\n"
+        "- Multi-layer Memory\n"
+        "- Quality Judge Module"
+    )
 
 
 def render_query_page():
     """Render query interaction page."""
+    history = st.session_state.conversation_history
+    
     st.markdown("## 💬 Query Assistant")
     
     # Query input
@@ -512,7 +726,7 @@ def render_query_page():
             
             if response:
                 # Add to history
-                st.session_state.conversation_history.append({
+                history.append({
                     "timestamp": datetime.now().isoformat(),
                     "query": query,
                     "response": response
@@ -527,15 +741,31 @@ def render_query_page():
                 st.error("Failed to process query")
     
     # Conversation history
-    if st.session_state.conversation_history:
+    if history:
         st.markdown("---")
         st.markdown("### 📜 Conversation History")
         
-        for idx, item in enumerate(reversed(st.session_state.conversation_history), 1):
-            with st.expander(f"Query {len(st.session_state.conversation_history) - idx + 1}: {item['query'][:50]}..."):
-                st.write(f"**Query:** {item['query']}")
-                st.write(f"**Time:** {item['timestamp']}")
-                st.markdown(f"**Answer:** {item['response'].get('answer', 'N/A')[:200]}...")
+        # Only the most recent entries get expanders; older ones load on demand
+        window = st.session_state.history_window
+        total = len(history)
+        start = max(0, total - window)
+        
+        recent = islice(reversed(history), window)
+        for number, item in zip(range(total, start, -1), recent):
+            query = item["query"]
+            answer = (item["response"].get("answer") or "N/A")[:200]
+            with st.expander(f"Query {number}: {query[:50]}..."):
+                # One markdown element per item instead of three
+                st.markdown(
+                    f"**Query:** {query}\n\n"
+                    f"**Time:** {item['timestamp']}\n\n"
+                    f"**Answer:** {answer}..."
+                )
+        
+        if start > 0:
+            if st.button(f"Load {min(HISTORY_PAGE_SIZE, start)} more ({start} older)", key="load_older_history"):
+                st.session_state.history_window += HISTORY_PAGE_SIZE
+                st.rerun()
 
 
 def render_document_page():
@@ -556,43 +786,45 @@ def render_document_page():
         # File uploader
         uploaded_file = st.file_uploader(
             "Choose a file",
-            type=["pdf", "txt", "md"],
+            type=UPLOAD_TYPES,
             label_visibility="collapsed"
         )
         
         if uploaded_file:
             # Display file info
             st.markdown("### File Preview")
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                st.metric("File Name", uploaded_file.name)
-            with col2:
-                st.metric("File Size", f"{uploaded_file.size / 1024:.1f} KB")
-            with col3:
-                st.metric("File Type", uploaded_file.type)
+            file_name = uploaded_file.name.replace("|", "\\|")
+            st.markdown(
+                "| File Name | File Size | File Type |\n"
+                "|---|---|---|\n"
+                f"| {file_name} | {uploaded_file.size / 1024:.1f} KB | {uploaded_file.type} |"
+            )
             
             # Save and ingest
             if st.button("✅ Ingest Document", type="primary"):
-                # Save temporary file
-                temp_path = f"./temp/{uploaded_file.name}"
-                Path("./temp").mkdir(exist_ok=True)
+                # Unique directory per upload so concurrent sessions never collide,
+                # while the file keeps its original name (recorded as the source)
+                upload_dir = Path(tempfile.mkdtemp(dir=TEMP_DIR))
+                temp_path = upload_dir / Path(uploaded_file.name).name
                 
-                with open(temp_path, "wb") as f:
-                    f.write(uploaded_file.getbuffer())
-                
-                # Ingest
-                with st.spinner("Ingesting document..."):
-                    result = ingest_document(temp_path)
+                # The upload directory is removed even if writing or ingestion fails
+                try:
+                    # Stream in 1 MB chunks instead of materializing the whole buffer
+                    with open(temp_path, "wb") as f:
+                        uploaded_file.seek(0)
+                        shutil.copyfileobj(uploaded_file, f, UPLOAD_CHUNK_BYTES)
                     
-                    if result:
-                        st.success(f"✅ Document ingested successfully!")
-                        st.json(result)
-                    else:
-                        st.error("Failed to ingest document")
-                
-                # Cleanup
-                Path(temp_path).unlink(missing_ok=True)
+                    # Ingest
+                    with st.spinner("Ingesting document..."):
+                        result = ingest_document(str(temp_path))
+                        
+                        if result:
+                            st.success(f"✅ Document ingested successfully!")
+                            st.json(result)
+                        else:
+                            st.error("Failed to ingest document")
+                finally:
+                    shutil.rmtree(upload_dir, ignore_errors=True)
     
     with tab2:
         st.markdown("### Ingestion Status")
@@ -601,20 +833,14 @@ def render_document_page():
             "**Current Status:** Ready for documents"
         )
         
-        # Placeholder stats
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.metric("Total Documents", "0")
-        with col2:
-            st.metric("Total Chunks", "0")
-        with col3:
-            st.metric("Vector Dimension", "384")
-        with col4:
-            st.metric("Storage Size", "0 MB")
+        # Placeholder stats: static values, so one table instead of four widgets
+        st.markdown(INGESTION_STATS_MARKDOWN)
 
 
 def render_analytics_page():
     """Render analytics and monitoring page."""
+    history = st.session_state.conversation_history
+    
     st.markdown("## 📊 Analytics & Monitoring")
     
     tab1, tab2 = st.tabs(["📈 Performance", "🔍 System Health"])
@@ -622,86 +848,41 @@ def render_analytics_page():
     with tab1:
         st.markdown("### Query Performance")
         
-        if st.session_state.conversation_history:
-            # Extract data
-            processing_times = []
-            quality_scores = []
-            cache_hits = []
-            timestamps = []
-            
-            for item in st.session_state.conversation_history:
-                resp = item["response"]
-                processing_times.append(resp.get("processing_time", 0))
-                quality_scores.append(resp.get("judge_evaluation", {}).get("score", 0))
-                cache_hits.append(1 if resp.get("cache_hit") else 0)
-                timestamps.append(item["timestamp"])
+        if history:
+            snapshot = analytics_snapshot(history)
             
             # Create visualizations
             col1, col2 = st.columns(2)
             
             with col1:
                 # Processing time chart
-                fig = go.Figure()
-                fig.add_trace(go.Scatter(
-                    x=list(range(len(processing_times))),
-                    y=processing_times,
-                    mode='lines+markers',
-                    name='Processing Time',
-                    line=dict(color='#1f77b4')
-                ))
-                fig.update_layout(
-                    title="Processing Time Trend",
-                    xaxis_title="Query Index",
-                    yaxis_title="Time (seconds)",
-                    hovermode='x unified'
+                fig = trend_figure(
+                    "processing_time", snapshot["processing_times"], "Processing Time",
+                    "Processing Time Trend", "Time (seconds)", '#1f77b4'
                 )
                 st.plotly_chart(fig, use_container_width=True)
             
             with col2:
                 # Quality score chart
-                fig = go.Figure()
-                fig.add_trace(go.Scatter(
-                    x=list(range(len(quality_scores))),
-                    y=quality_scores,
-                    mode='lines+markers',
-                    name='Quality Score',
-                    line=dict(color='#2ca02c')
-                ))
-                fig.update_layout(
-                    title="Answer Quality Trend",
-                    xaxis_title="Query Index",
-                    yaxis_title="Score (0-1)",
-                    hovermode='x unified'
+                fig = trend_figure(
+                    "quality_score", snapshot["quality_scores"], "Quality Score",
+                    "Answer Quality Trend", "Score (0-1)", '#2ca02c'
                 )
                 st.plotly_chart(fig, use_container_width=True)
             
             # Statistics table
             st.markdown("### Query Statistics")
-            stats_df = pd.DataFrame({
-                "Metric": [
-                    "Total Queries",
-                    "Cache Hit Rate",
-                    "Avg Processing Time",
-                    "Avg Quality Score",
-                    "Min Processing Time",
-                    "Max Processing Time"
-                ],
-                "Value": [
-                    len(processing_times),
-                    f"{(sum(cache_hits) / len(cache_hits) * 100):.1f}%",
-                    f"{sum(processing_times) / len(processing_times):.2f}s",
-                    f"{sum(quality_scores) / len(quality_scores):.2f}",
-                    f"{min(processing_times):.2f}s",
-                    f"{max(processing_times):.2f}s"
-                ]
-            })
-            st.dataframe(stats_df, use_container_width=True)
+            st.dataframe(snapshot["stats_df"], use_container_width=True)
         else:
             st.info("No query data available yet. Start by asking a question!")
     
     with tab2:
         st.markdown("### System Health")
         
+        if st.button("🔄 Refresh", key="refresh_health"):
+            # Drop the cached status so the check below hits the API
+            fetch_backend_status.clear()
+        
         col1, col2, col3 = st.columns(3)
         
         with col1:
@@ -754,6 +935,7 @@ def render_settings_page():
         
         if st.button("🔄 Test Connection"):
             with st.spinner("Testing connection..."):
+                fetch_backend_status.clear()
                 health = check_api_health()
                 if health:
                     st.success("✅ Connection successful!")
@@ -788,19 +970,58 @@ def render_settings_page():
 # MAIN APP
 # ============================================================================
 
+HELP_MARKDOWN = """
+### Getting Started
+
+1. **Ask Questions**: Use the Query tab to ask questions about your documents
+2. **Upload Documents**: Add PDF, TXT, or MD files in the Documents tab
+3. **Monitor Performance**: Check real-time analytics in the Analytics tab
+
+### Features
+
+- **Semantic Search**: Retrieves relevant documents using embeddings
+- **LLM Answer**: Generates contextual answers using Llama 3.1
+- **Quality Judge**: Automatically evaluates answer quality
+- **Caching**: Fast responses for repeated questions
+- **Multi-layer Memory**: Short-term and long-term conversation tracking
+
+### Supported File Types
+
+- PDF (.pdf)
+- Plain Text (.txt)
+- Markdown (.md)
+
+### Performance Tips
+
+- Shorter, specific questions yield better results
+- Longer documents provide more context
+- First query takes longer (LLM initialization)
+- Repeated queries are cached for speed
+
+### Troubleshooting
+
+**API is offline?**
+- Ensure FastAPI server is running: `python -m uvicorn app.main:app`
+
+**Slow responses?**
+- Check network connection
+- Monitor system resources
+- Clear cache if needed
+
+**Poor answer quality?**
+- Add more relevant documents
+- Rephrase your question
+- Use more specific terminology
+"""
+
+
 def main():
     """Main app logic."""
     render_header()
     render_sidebar()
     
     # Main tabs
-    tab1, tab2, tab3, tab4, tab5 = st.tabs([
-        "💬 Query",
-        "📄 Documents",
-        "📊 Analytics",
-        "⚙️ Settings",
-        "ℹ️ Help"
-    ])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(MAIN_TABS)
     
     with tab1:
         render_query_page()
@@ -817,49 +1038,7 @@ def main():
     with tab5:
         st.markdown("## Help & Documentation")
         
-        st.markdown("""
-        ### Getting Started
-        
-        1. **Ask Questions**: Use the Query tab to ask questions about your documents
-        2. **Upload Documents**: Add PDF, TXT, or MD files in the Documents tab
-        3. **Monitor Performance**: Check real-time analytics in the Analytics tab
-        
-        ### Features
-        
-        - **Semantic Search**: Retrieves relevant documents using embeddings
-        - **LLM Answer**: Generates contextual answers using Llama 3.1
-        - **Quality Judge**: Automatically evaluates answer quality
-        - **Caching**: Fast responses for repeated questions
-        - **Multi-layer Memory**: Short-term and long-term conversation tracking
-        
-        ### Supported File Types
-        
-        - PDF (.pdf)
-        - Plain Text (.txt)
-        - Markdown (.md)
-        
-        ### Performance Tips
-        
-        - Shorter, specific questions yield better results
-        - Longer documents provide more context
-        - First query takes longer (LLM initialization)
-        - Repeated queries are cached for speed
-        
-        ### Troubleshooting
-        
-        **API is offline?**
-        - Ensure FastAPI server is running: `python -m uvicorn app.main:app`
-        
-        **Slow responses?**
-        - Check network connection
-        - Monitor system resources
-        - Clear cache if needed
-        
-        **Poor answer quality?**
-        - Add more relevant documents
-        - Rephrase your question
-        - Use more specific terminology
-        """)
+        st.markdown(HELP_MARKDOWN)
 
 
 if __name__ == "__main__":
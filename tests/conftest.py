@@ -0,0 +1,21 @@
+"""
+Shared pytest fixtures.
+
+Model-backed objects are session-scoped so each is built once per run.
+"""
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def embedder():
+    """Embedding generator shared by every test (loads the model once)."""
+    from app.ingestion.embedder import EmbeddingGenerator
+    return EmbeddingGenerator()
+
+
+@pytest.fixture(scope="session")
+def judge_llm():
+    """Groq LLM client shared by every test."""
+    from app.llm.groq_wrapper import GroqLLM
+    return GroqLLM()
@@ -2,19 +2,64 @@
 Fixed test script for RAG + LLM System
 """
 
+import asyncio
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import time
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 BASE_URL = "http://127.0.0.1:8000/api/v1"
 
+# One keep-alive session for every call, so requests reuse pooled connections
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+# Concurrent queries print their report as one block under this lock
+QUERY_WORKERS = 4
+_PRINT_LOCK = threading.Lock()
+
+# Load run: set STRESS_ROUNDS to repeat the test questions that many times
+STRESS_MAX_IN_FLIGHT = 64
+
+
+def post_json(path, payload, timeout):
+    """POST a JSON payload, encoding it with orjson when available."""
+    if ORJSON_AVAILABLE:
+        return SESSION.post(
+            f"{BASE_URL}{path}",
+            data=orjson.dumps(payload),
+            headers={"Content-Type": "application/json"},
+            timeout=timeout,
+        )
+    return SESSION.post(f"{BASE_URL}{path}", json=payload, timeout=timeout)
+
+
+def read_json(response):
+    """Decode a JSON response body, with orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(response.content)
+    return response.json()
+
+def preview(text, limit):
+    """First `limit` characters of text, with "..." when truncated."""
+    return f"{text[:limit]}..." if len(text) > limit else text
+
 def test_health():
     """Test health endpoint."""
     try:
-        response = requests.get(f"{BASE_URL}/health", timeout=10)
-        print("Health Check:", response.json())
+        response = SESSION.get(f"{BASE_URL}/health", timeout=10)
+        print("Health Check:", read_json(response))
         return response.status_code == 200
     except Exception as e:
         print(f"Health check error: {e}")
@@ -60,10 +105,10 @@ def test_ingestion():
             "file_path": file_path
         }
         
-        response = requests.post(f"{BASE_URL}/ingest", json=payload, timeout=30)
+        response = post_json("/ingest", payload, timeout=30)
         
         if response.status_code == 200:
-            result = response.json()
+            result = read_json(response)
             print(f"✅ Ingested {result['chunks_indexed']} chunks from {result['file_path']}")
             return True
         else:
@@ -73,7 +118,7 @@ def test_ingestion():
         print(f"❌ Ingestion request failed: {e}")
         return False
 
-def test_query(question, session_id="test_session"):
+def test_query(question, session_id="test_session", header=None):
     """Test query endpoint."""
     payload = {
         "query": question,
@@ -81,38 +126,79 @@ def test_query(question, session_id="test_session"):
         "user_id": "test_user"
     }
     
+    # Buffer the report so concurrent queries don't interleave their output
+    lines = [header] if header else []
+    emit = lines.append
     try:
-        response = requests.post(f"{BASE_URL}/query", json=payload, timeout=60)
+        response = post_json("/query", payload, timeout=60)
         
         if response.status_code == 200:
-            result = response.json()
-            print(f"\n✅ Query: {question}")
+            result = read_json(response)
+            emit(f"\n✅ Query: {question}")
             
             if result['answer']:
-                answer_preview = result['answer'][:200] + "..." if len(result['answer']) > 200 else result['answer']
-                print(f"✅ Answer: {answer_preview}")
+                emit(f"✅ Answer: {preview(result['answer'], 200)}")
             else:
-                print("✅ Answer: [No answer generated]")
+                emit("✅ Answer: [No answer generated]")
                 
-            print(f"✅ Cache Hit: {result['cache_hit']}")
-            print(f"✅ Processing Time: {result['processing_time']:.2f}s")
-            print(f"✅ Quality Passed: {result['quality_passed']}")
+            emit(f"✅ Cache Hit: {result['cache_hit']}")
+            emit(f"✅ Processing Time: {result['processing_time']:.2f}s")
+            emit(f"✅ Quality Passed: {result['quality_passed']}")
             
             if result.get('judge_evaluation'):
-                print(f"✅ Judge Score: {result['judge_evaluation']['score']}/10")
+                emit(f"✅ Judge Score: {result['judge_evaluation']['score']}/10")
             
-            print(f"✅ Retrieved Documents: {len(result['retrieved_docs'])}")
+            emit(f"✅ Retrieved Documents: {len(result['retrieved_docs'])}")
             for i, doc in enumerate(result['retrieved_docs'][:2]):  # Show first 2
-                content_preview = doc['content'][:100] + "..." if len(doc['content']) > 100 else doc['content']
-                print(f"   📄 Doc {i+1}: {content_preview}")
+                emit(f"   📄 Doc {i+1}: {preview(doc['content'], 100)}")
             
             return True
         else:
-            print(f"❌ Error: {response.status_code} - {response.text}")
+            emit(f"❌ Error: {response.status_code} - {response.text}")
             return False
     except Exception as e:
-        print(f"❌ Request failed: {e}")
+        emit(f"❌ Request failed: {e}")
         return False
+    finally:
+        with _PRINT_LOCK:
+            print("\n".join(lines))
+
+async def aquery(client, question, session_id):
+    """Send one query on a shared async client; returns the result or None."""
+    payload = {
+        "query": question,
+        "session_id": session_id,
+        "user_id": "test_user"
+    }
+    try:
+        response = await client.post("/query", json=payload)
+    except httpx.HTTPError:
+        return None
+    return read_json(response) if response.status_code == 200 else None
+
+async def run_queries(questions, max_in_flight=STRESS_MAX_IN_FLIGHT):
+    """Send all questions concurrently from one event loop and connection pool."""
+    limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+    async with httpx.AsyncClient(base_url=BASE_URL, timeout=60, limits=limits) as client:
+        return await asyncio.gather(*(
+            aquery(client, question, f"stress_session_{i}")
+            for i, question in enumerate(questions)
+        ))
+
+def stress_queries(questions, rounds):
+    """Fire `rounds` copies of the questions at once and print a summary."""
+    batch = list(questions) * rounds
+    start = time.perf_counter()
+    results = asyncio.run(run_queries(batch))
+    elapsed = time.perf_counter() - start
+    
+    succeeded = [r for r in results if r]
+    print(f"\n⚡ Stress: {len(succeeded)}/{len(batch)} queries succeeded in {elapsed:.2f}s "
+          f"({len(batch) / elapsed:.1f} req/s)")
+    if succeeded:
+        avg = sum(r.get("processing_time", 0) for r in succeeded) / len(succeeded)
+        print(f"⚡ Avg server processing time: {avg:.2f}s")
+    return len(succeeded) == len(batch)
 
 def test_empty_query():
     """Test the system with no documents ingested."""
@@ -159,13 +245,22 @@ def main():
             "Explain machine learning",
         ]
         
-        for i, question in enumerate(test_questions):
-            print(f"\n{'='*60}")
-            print(f"Test {i+1}/{len(test_questions)}")
-            success = test_query(question, f"session_{i+1}")
-            if not success:
-                print("❌ Query test failed!")
-                break
+        # Queries are independent: overlap their network and server time
+        def run(indexed):
+            i, question = indexed
+            header = f"\n{'='*60}\nTest {i+1}/{len(test_questions)}"
+            return test_query(question, f"session_{i+1}", header=header)
+        
+        with ThreadPoolExecutor(max_workers=QUERY_WORKERS) as executor:
+            results = list(executor.map(run, enumerate(test_questions)))
+        if not all(results):
+            print("❌ Query test failed!")
+        
+        rounds = int(os.environ.get("STRESS_ROUNDS", "0"))
+        if rounds > 0:
+            print(f"\n4. Stress testing query endpoint ({rounds} rounds)...")
+            if not stress_queries(test_questions, rounds):
+                print("❌ Some stress queries failed!")
     else:
         print("⚠️ Ingestion failed, but continuing with empty DB tests...")
     
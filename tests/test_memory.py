@@ -50,3 +50,111 @@ async def test_long_term_memory():
 
         facts = memory.get_facts(session_id)
         assert "user_interest" in facts
+
+
+def test_long_term_memory_read_cache_invalidation():
+    """Cached session reads are refreshed after writes."""
+    import tempfile
+    from pathlib import Path
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        memory = LongTermMemory(str(Path(tmpdir) / "memory.db"))
+        session_id = "cache_session"
+
+        memory.store_fact(session_id, "topic", "rag")
+        assert memory.get_facts(session_id) == {"topic": "rag"}
+
+        memory.store_fact(session_id, "topic", "llm")
+        assert memory.get_facts(session_id) == {"topic": "llm"}
+
+        memory.add_message(session_id=session_id, role="user", content="Hi")
+        assert len(memory.get_session_messages(session_id)) == 1
+
+        memory.add_message(session_id=session_id, role="assistant", content="Hello")
+        assert len(memory.get_session_messages(session_id)) == 2
+
+
+def test_long_term_memory_cache_isolation():
+    """Callers can't corrupt the cache, and other instances' writes are seen."""
+    import tempfile
+    from pathlib import Path
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = str(Path(tmpdir) / "memory.db")
+        memory = LongTermMemory(db_path)
+        session_id = "isolation_session"
+
+        memory.add_message(session_id=session_id, role="user", content="Hi")
+        first = memory.get_session_messages(session_id)
+        first[0]["content"] = "mutated"
+        first[0]["metadata"]["injected"] = True
+        cached = memory.get_session_messages(session_id)
+        assert cached[0]["content"] == "Hi"
+        assert cached[0]["metadata"] == {}
+
+        other = LongTermMemory(db_path)
+        other.add_message(session_id=session_id, role="assistant", content="Hello")
+        assert len(memory.get_session_messages(session_id)) == 2
+
+
+def test_long_term_memory_read_racing_write():
+    """A write landing between the query and the cache put isn't masked."""
+    import tempfile
+    from pathlib import Path
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = str(Path(tmpdir) / "memory.db")
+        memory = LongTermMemory(db_path)
+        other = LongTermMemory(db_path)
+        session_id = "race_session"
+        memory.store_fact(session_id, "topic", "rag")
+
+        original_put = memory._cache_put
+
+        def put_after_write(*args):
+            other.store_fact(session_id, "topic", "llm")
+            original_put(*args)
+
+        memory._cache_put = put_after_write
+        assert memory.get_facts(session_id) == {"topic": "rag"}
+        memory._cache_put = original_put
+        assert memory.get_facts(session_id) == {"topic": "llm"}
+
+
+def test_long_term_memory_migrates_old_facts_schema():
+    """Databases with the old AUTOINCREMENT facts table are rebuilt and deduped."""
+    import sqlite3
+    import tempfile
+    from pathlib import Path
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = str(Path(tmpdir) / "memory.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute("""
+            CREATE TABLE facts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            )
+        """)
+        conn.executemany(
+            "INSERT INTO facts (session_id, key, value, created_at) VALUES (?, ?, ?, ?)",
+            [
+                ("s1", "topic", "rag", "2024-01-01"),
+                ("s1", "topic", "llm", "2024-01-02"),
+                ("s1", "lang", "python", "2024-01-01"),
+            ],
+        )
+        conn.commit()
+        conn.close()
+
+        memory = LongTermMemory(db_path)
+        assert memory.get_facts("s1") == {"topic": "llm", "lang": "python"}
+
+        memory.store_fact("s1", "topic", "agents")
+        conn = sqlite3.connect(db_path)
+        rows = conn.execute("SELECT value FROM facts WHERE key = 'topic'").fetchall()
+        conn.close()
+        assert rows == [("agents",)]
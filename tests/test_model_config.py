@@ -0,0 +1,50 @@
+"""
+Tests for models config loading.
+"""
+
+from app.models.model_config import MultiModelConfig
+
+CONFIG = """
+models:
+  fast:
+    provider: groq
+    model_name: llama
+    cost_per_1k_tokens: 0.1
+    latency_ms_estimate: 100
+    context_window: 8192
+    quality_tier: medium
+    api_key: ${TEST_MODEL_KEY}
+    endpoint: "$$escaped $TEST_MODEL_UNSET"
+routing:
+  fallback_chain: [fast]
+"""
+
+
+def test_config_instances_are_isolated(tmp_path, monkeypatch):
+    """Env changes are picked up and mutations don't leak between instances."""
+    config_path = tmp_path / "models.yaml"
+    config_path.write_text(CONFIG)
+    monkeypatch.delenv("TEST_MODEL_UNSET", raising=False)
+
+    monkeypatch.setenv("TEST_MODEL_KEY", "first")
+    first = MultiModelConfig(str(config_path))
+    assert first.get_model("fast").api_key == "first"
+    assert first.get_model("fast").endpoint == "$escaped $TEST_MODEL_UNSET"
+    first.routing["fallback_chain"].append("mutated")
+
+    monkeypatch.setenv("TEST_MODEL_KEY", "second")
+    second = MultiModelConfig(str(config_path))
+    assert second.get_model("fast").api_key == "second"
+    assert second.get_fallback_chain() == ["fast"]
+
+
+def test_env_substitution_escapes(tmp_path, monkeypatch):
+    """$$ yields a literal $, even directly before a variable name."""
+    config_path = tmp_path / "models.yaml"
+    config_path.write_text(
+        CONFIG.replace("$$escaped $TEST_MODEL_UNSET", "$${TEST_MODEL_KEY} $$TEST_MODEL_KEY $TEST_MODEL_KEY")
+    )
+    monkeypatch.setenv("TEST_MODEL_KEY", "secret")
+
+    config = MultiModelConfig(str(config_path))
+    assert config.get_model("fast").endpoint == "${TEST_MODEL_KEY} $TEST_MODEL_KEY secret"
@@ -0,0 +1,41 @@
+"""
+Tests for the cost-aware model router.
+"""
+
+import pytest
+
+from app.routing.model_router import _is_unusable_answer
+from app.routing.query_classifier import QueryClassifier, _build_automaton
+
+
+def test_unusable_answer_detection():
+    """Failure shapes are rejected; real answers starting with "Error" are not."""
+    assert _is_unusable_answer("")
+    assert _is_unusable_answer("  \n\t ")
+    assert _is_unusable_answer("Error: rate limit exceeded")
+    assert _is_unusable_answer("Traceback (most recent call last):\n  File ...")
+    assert _is_unusable_answer("<!DOCTYPE html><html>502 Bad Gateway</html>")
+
+    assert not _is_unusable_answer(
+        "Error handling in the project uses structured logging and retries."
+    )
+    assert not _is_unusable_answer("Errors are surfaced through the API's JSON responses.")
+
+
+def test_short_answers_are_usable():
+    """Terse but valid answers don't trigger a paid fallback."""
+    assert not _is_unusable_answer("Python.")
+    assert not _is_unusable_answer("Yes, 2021.")
+
+
+@pytest.mark.parametrize("use_automaton", [False, True])
+def test_keyword_hits_with_and_without_pyahocorasick(use_automaton):
+    """Keyword matching gives the same counts on both paths."""
+    if use_automaton:
+        pytest.importorskip("ahocorasick")
+    classifier = QueryClassifier.__new__(QueryClassifier)
+    classifier._automaton = _build_automaton() if use_automaton else None
+
+    assert classifier._keyword_hits("why and how? explain why") == (3, False)
+    assert classifier._keyword_hits("debug this api error") == (0, True)
+    assert classifier._keyword_hits("hello there") == (0, False)
@@ -2,18 +2,12 @@
 
 import pytest
 from app.monitoring.rag_evaluators import RAGEvaluator, RetrievalEvaluator, GenerationEvaluator
-from app.llm.groq_wrapper import GroqLLM
 
 
 class TestRAGEvaluation:
     """Test RAG evaluation system."""
     
-    @pytest.fixture
-    def judge_llm(self):
-        """Create judge LLM."""
-        return GroqLLM()
-    
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def evaluator(self, judge_llm):
         """Create evaluator."""
         return RAGEvaluator(judge_llm)
@@ -70,3 +64,92 @@ class TestRAGEvaluation:
         assert "system" in result
         assert "overall_score" in result
         assert 0 <= result["overall_score"] <= 1
+
+
+def test_ndcg_from_relevance():
+    """NDCG@k matches the closed-form value."""
+    import numpy as np
+
+    retriever = RetrievalEvaluator()
+
+    expected = (1.0 + 1.0 / np.log2(4)) / (1.0 + 1.0 / np.log2(3))
+    assert retriever._compute_ndcg_from_relevance([1.0, 0.0, 1.0]) == pytest.approx(expected)
+    assert retriever._compute_ndcg_from_relevance([1.0, 0.5, 0.0]) == pytest.approx(1.0)
+    assert retriever._compute_ndcg_from_relevance([]) == 0.0
+
+    # Exponential gain: same as linear for binary labels, differs for graded ones
+    assert retriever._compute_ndcg_from_relevance([1.0, 0.0, 1.0], gain="exponential") == pytest.approx(expected)
+    graded = (1.0 + 3.0 / np.log2(3)) / (3.0 + 1.0 / np.log2(3))
+    assert retriever._compute_ndcg_from_relevance([1.0, 2.0], gain="exponential") == pytest.approx(graded)
+
+
+def test_summary_includes_persisted_history(tmp_path):
+    """A fresh evaluator counts evaluations logged by an earlier process."""
+    from app.monitoring.rag_evaluators import _dumps_line
+
+    metrics_file = tmp_path / "rag_evaluations.jsonl"
+    previous = {
+        "overall_score": 0.5,
+        "system": {"latency_ms": 100.0, "cost_usd": 0.001},
+        "retrieval": {},
+        "generation": {},
+    }
+    metrics_file.write_bytes(_dumps_line(previous) * 5)
+
+    evaluator = RAGEvaluator(str(metrics_file))
+    evaluator.evaluate_rag_response(
+        query="What is AI?",
+        retrieved_docs=[{"content": "AI is artificial intelligence", "distance": 0.2}],
+        answer="AI is artificial intelligence.",
+        judge_evaluation={"score": 0.8},
+        latency_ms=200.0,
+        cost_usd=0.002,
+    )
+
+    summary = evaluator.get_evaluation_summary()
+    assert summary["total_evaluations"] == 6
+    assert summary["total_cost_usd"] == pytest.approx(0.007)
+
+
+def test_summary_reads_across_rotated_segment(tmp_path):
+    """Seeding continues into the rotated file when the live one is short."""
+    import os
+    from app.monitoring.rag_evaluators import _dumps_line
+
+    def line(cost):
+        return _dumps_line({
+            "overall_score": 0.5,
+            "system": {"latency_ms": 100.0, "cost_usd": cost},
+            "retrieval": {},
+            "generation": {},
+        })
+
+    metrics_file = tmp_path / "rag_evaluations.jsonl"
+    older = tmp_path / "rag_evaluations.20240101T000000.jsonl"
+    old = tmp_path / "rag_evaluations.20240102T000000.jsonl"
+    older.write_bytes(line(1.0) * 2000)
+    old.write_bytes(line(0.01) * 600)
+    metrics_file.write_bytes(line(0.001) * 500)
+    os.utime(older, (1, 1))
+    os.utime(old, (2, 2))
+
+    summary = RAGEvaluator(str(metrics_file)).get_evaluation_summary(last_n=1000)
+    assert summary["total_evaluations"] == 1000
+    assert summary["total_cost_usd"] == pytest.approx(500 * 0.001 + 500 * 0.01)
+
+
+@pytest.mark.parametrize("use_automaton", [False, True])
+def test_match_ground_truth_with_and_without_pyahocorasick(monkeypatch, use_automaton):
+    """The Aho-Corasick and pairwise paths flag the same documents."""
+    from app.monitoring import rag_evaluators
+
+    if use_automaton:
+        pytest.importorskip("ahocorasick")
+    monkeypatch.setattr(rag_evaluators, "AHOCORASICK_AVAILABLE", use_automaton)
+
+    retrieved = ["python and fastapi", "fastapi", "rust", "", "go"]
+    ground_truth = ["fastapi", "go services"]
+    assert rag_evaluators._match_ground_truth(retrieved, ground_truth) == [
+        True, True, False, True, True,
+    ]
+    assert rag_evaluators._match_ground_truth(["rust"], ["", "go"]) == [True]
@@ -5,7 +5,6 @@ Tests for RAG flow.
 import pytest
 from app.graph.state import RAGState
 from app.ingestion.splitter import TextSplitter
-from app.ingestion.embedder import EmbeddingGenerator
 from app.vector.store import VectorStore
 
 
@@ -36,11 +35,9 @@ def test_text_splitter():
     assert all(len(chunk) <= 100 for chunk in chunks)
 
 
-def test_embedding_generator():
+def test_embedding_generator(embedder):
     """Test embedding generator."""
-    generator = EmbeddingGenerator()
-
-    embedding = generator.embed_query("What is AI?")
+    embedding = embedder.embed_query("What is AI?")
     assert len(embedding) > 0
     assert isinstance(embedding, list)
     assert all(isinstance(x, float) for x in embedding)
@@ -63,3 +60,24 @@ async def test_vector_store():
     # store.add_documents(docs)
     # results = store.search([0.1] * 384, k=2)
     # assert len(results) > 0
+
+
+def test_vector_stores_share_collection_state(tmp_path):
+    """Stores on one path see each other's writes and clears."""
+    from langchain.schema import Document
+
+    class FixedEmbedder:
+        def embed_documents(self, texts):
+            return [[1.0, 0.0, 0.0] for _ in texts]
+
+    first = VectorStore(db_path=str(tmp_path), collection_name="shared")
+    second = VectorStore(db_path=str(tmp_path), collection_name="shared")
+
+    first.add_documents([Document(page_content="AI", metadata={"source": "test"})], FixedEmbedder())
+    assert second.version == first.version > 0
+    assert second.get_collection_stats()["document_count"] == 1
+
+    version = second.version
+    first.clear()
+    assert second.version > version
+    assert second.get_collection_stats()["document_count"] == 0
@@ -1,8 +1,9 @@
 import asyncio
+import pytest
 from fastapi.testclient import TestClient
 
 from app.main import app
-from app.api.routes import init_routes
+from app.api.routes import get_graph_builder, get_rag_result_cache, get_retriever
 
 
 class DummyGraphBuilder:
@@ -15,7 +16,17 @@ class DummyGraphBuilder:
         return self._result
 
 
-def test_query_route_with_dict_result():
+@pytest.fixture
+def override_graph_builder():
+    """Install a dummy graph builder for one test, then restore the app."""
+    def _override(result):
+        app.dependency_overrides[get_graph_builder] = lambda: DummyGraphBuilder(result)
+
+    yield _override
+    app.dependency_overrides.clear()
+
+
+def test_query_route_with_dict_result(override_graph_builder):
     # Prepare a dict-shaped graph result
     graph_result = {
         "query": "What is AI?",
@@ -26,7 +37,7 @@ def test_query_route_with_dict_result():
         "quality_passed": False,
     }
 
-    init_routes(DummyGraphBuilder(graph_result), indexer=None)
+    override_graph_builder(graph_result)
 
     client = TestClient(app)
 
@@ -39,7 +50,7 @@ def test_query_route_with_dict_result():
     assert data["query"] == "What is AI?"
 
 
-def test_query_route_with_ragstate_like_object():
+def test_query_route_with_ragstate_like_object(override_graph_builder):
     # Create a simple object that has a to_dict method
     class FakeState:
         def to_dict(self):
@@ -52,7 +63,7 @@ def test_query_route_with_ragstate_like_object():
                 "quality_passed": False,
             }
 
-    init_routes(DummyGraphBuilder(FakeState()), indexer=None)
+    override_graph_builder(FakeState())
 
     client = TestClient(app)
 
@@ -63,3 +74,42 @@ def test_query_route_with_ragstate_like_object():
     data = resp.json()
     assert data["answer"] == "AI is ..."
     assert data["query"] == "What is AI?"
+
+
+class DummyCache:
+    def __init__(self):
+        self.cleared = False
+
+    def clear(self):
+        self.cleared = True
+
+    def get_stats(self):
+        return {"size": 0}
+
+    def stats(self):
+        return {"size": 0}
+
+    clear_cache = clear
+    get_cache_stats = stats
+
+
+def test_cache_clear_drops_every_cache_tier():
+    graph_cache, retriever, result_cache = DummyCache(), DummyCache(), DummyCache()
+    builder = DummyGraphBuilder(None)
+    builder.cache = graph_cache
+    app.dependency_overrides[get_graph_builder] = lambda: builder
+    app.dependency_overrides[get_retriever] = lambda: retriever
+    app.dependency_overrides[get_rag_result_cache] = lambda: result_cache
+    try:
+        client = TestClient(app)
+
+        resp = client.get("/api/v1/cache/clear")
+        assert resp.status_code == 200, resp.text
+        assert graph_cache.cleared and retriever.cleared and result_cache.cleared
+
+        resp = client.get("/api/v1/cache/stats")
+        assert resp.status_code == 200, resp.text
+        assert resp.json()["retrieval_cache"] == {"size": 0}
+        assert resp.json()["result_cache"] == {"size": 0}
+    finally:
+        app.dependency_overrides.clear()